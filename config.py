@@ -15,6 +15,8 @@ SETTINGS YOU MAY EDIT:
 - WAV_POINTS      : Number of waveform points to request from the scope.
                     1000 is safe for all models; higher values may improve
                     resolution but can slow transfers or fail on older scopes.
+- WAV_FORMAT      : "BYTE" (default) or "WORD" sample format for waveform
+                    transfers.
 
 DO NOT CHANGE UNLESS YOU KNOW WHAT YOU ARE DOING:
 - BLACKLISTED_COMMANDS : List of SCPI queries known to cause instability,
@@ -38,6 +40,12 @@ INTERVALL_SCPI = 4   # seconds between SCPI queries
 # === Waveform resolution ===
 WAV_POINTS = 1000    # safe default; higher = more resolution, but slower
 
+# Sample format for :WAV:DATA? transfers: "BYTE" (1 byte/pt) or "WORD"
+# (2 bytes/pt, little-endian). WORD only pays off if the firmware delivers
+# more than 8 valid bits (e.g. high-resolution acquisition); otherwise it
+# just doubles the transfer size.
+WAV_FORMAT = "BYTE"
+
 # === SCPI blacklist ===
 # These commands are either unsupported, redundant, or known to cause hangs.
 BLACKLISTED_COMMANDS = [
@@ -20,7 +20,7 @@ import matplotlib.cm as cm
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 import app.app_state as app_state
-from scpi.interface import safe_query, scpi_lock
+from scpi.interface import safe_query, get_idn, scpi_lock
 from utils.debug import log_debug
 
 mu0 = 4 * np.pi * 1e-7  # H/m, permeability of free space
@@ -652,7 +652,7 @@ def setup_bh_curve_tab(tab_frame, ip, root):
             with open(csv_path, "a", newline="") as f:
                 writer = csv.writer(f)
                 if write_header:
-                    idn = safe_query(app_state.scope, "*IDN?", "Unknown") if getattr(app_state, "scope", None) else "Unknown"
+                    idn = get_idn(getattr(app_state, "scope", None), "Unknown")
                     writer.writerow(["# BH-curve data log"])
                     writer.writerow(["# Device", idn, "N", N, "Ae (m^2)", Ae, "le (m)", le, "Probe", probe_mode, "Probe Value", probe_val, "Samples", samples, "dt (s)", dt])
                     writer.writerow(["# Columns: run_index, time_iso, H (A/m), B (T)"])
@@ -672,7 +672,7 @@ def setup_bh_curve_tab(tab_frame, ip, root):
                 t_proc = np.arange(len(H)) * (dt_eff if 'dt_eff' in locals() else dt)
                 with open(detailed_path, "w", newline="") as f:
                     writer = csv.writer(f)
-                    idn = safe_query(app_state.scope, "*IDN?", "Unknown") if getattr(app_state, "scope", None) else "Unknown"
+                    idn = get_idn(getattr(app_state, "scope", None), "Unknown")
                     writer.writerow(["# Device", idn])
                     writer.writerow(["# Columns: t(s), V(V), I(A), H(A/m), B(T)"])
                     for k in range(len(H)):
@@ -797,7 +797,7 @@ def setup_bh_curve_tab(tab_frame, ip, root):
             outdir = os.path.join("oszi_csv", "bh-curve")
             os.makedirs(outdir, exist_ok=True)
             path = os.path.join(outdir, f"bhcurve_{timestamp}.png")
-            idn = safe_query(app_state.scope, "*IDN?", "Unknown") if getattr(app_state, "scope", None) else "Unknown"
+            idn = get_idn(getattr(app_state, "scope", None), "Unknown")
             meta = f"IDN: {idn}  |  N={entry_N.get()}  Ae={float(entry_Ae.get())*1e-6:.2e} m²  le={float(entry_le.get())*1e-3:.2e} m  ts={timestamp}"
             fig_ = ax.get_figure()
             txt = fig_.text(0.01, 0.01, meta, color='white', fontsize=7)
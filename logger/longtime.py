@@ -21,7 +21,7 @@ from datetime import datetime, timedelta
 
 # Internal imports
 from scpi.waveform import get_channel_waveform_data   # fetch Vpp, Vavg, Vrms
-from scpi.interface import safe_query, scpi_lock      # safe SCPI communication
+from scpi.interface import safe_query, get_idn, scpi_lock  # safe SCPI communication
 import app.app_state as app_state                     # global application state
 from utils.debug import log_debug, set_debug_level    # debug logging
 
@@ -63,7 +63,7 @@ def start_logging(_scope_unused, ip, channels, duration, interval, vavg_enabled,
 
     def loop():
         with scpi_lock:
-            log_debug(f"🧪 Logging scope ID: {safe_query(scope, '*IDN?', 'N/A')}", level="MINIMAL")
+            log_debug(f"🧪 Logging scope ID: {get_idn(scope, 'N/A')}", level="MINIMAL")
         nonlocal csv_path
         try:
             with open(csv_path, "w", newline="") as f:
@@ -20,7 +20,7 @@ from gui.layout import create_main_gui
 from gui.noise_inspector import setup_noise_inspector_tab
 from gui.image_display import attach_image_label, update_image, set_ip, start_screenshot_thread
 from gui.activity_monitor import start_meter_thread, draw_meter
-from scpi.interface import connect_scope, safe_query
+from scpi.interface import connect_scope, safe_query, get_idn
 from scpi.loop import start_scpi_loop
 from scpi.data import scpi_data
 import app.app_state as app_state
@@ -60,7 +60,7 @@ def connect_and_prepare(ip: str):
 
     # Save IDN + get frequency reference (best-effort)
     try:
-        idn = safe_query(scope, "*IDN?")
+        idn = get_idn(scope)
         os.makedirs("utils", exist_ok=True)
         with open("utils/idn.txt", "w") as f:
             f.write(idn.strip())
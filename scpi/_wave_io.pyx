@@ -0,0 +1,84 @@
+# scpi/_wave_io.pyx
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# distutils: extra_compile_args = -O3 -march=native -ffast-math -fopenmp
+# distutils: extra_link_args = -fopenmp
+#
+# Compiled fast path for :WAV:DATA? BYTE/WORD blocks (see scpi/wave_io.py).
+# Build in place from the project root:
+#   cythonize -i scpi/_wave_io.pyx
+
+import numpy as np
+from cython.parallel cimport prange
+from libc.math cimport sqrt
+
+
+cdef inline Py_ssize_t _digit(unsigned char c) except -1:
+    if c < 48 or c > 57:
+        raise ValueError("Malformed IEEE 488.2 block header")
+    return c - 48
+
+
+def parse_block_header(const unsigned char[::1] payload):
+    """Return (start, count) of the sample bytes inside a '#N<len>' block."""
+    cdef Py_ssize_t size = payload.shape[0]
+    cdef Py_ssize_t ndig, start, count, k
+
+    if size < 2 or payload[0] != 35:  # '#'
+        raise ValueError("Missing IEEE 488.2 block header")
+
+    ndig = _digit(payload[1])
+    start = 2 + ndig
+    if ndig == 0:
+        # Indefinite-length block: runs up to the terminator
+        count = size - start
+        if count > 0 and payload[size - 1] == 10:
+            count -= 1
+        return start, count
+
+    if size < start:
+        raise ValueError("Truncated IEEE 488.2 block header")
+    count = 0
+    for k in range(2, start):
+        count = count * 10 + _digit(payload[k])
+    if count > size - start:
+        count = size - start
+    return start, count
+
+
+def decode_and_stats(const unsigned char[::1] payload, double yref, double yinc,
+                     double yorig, double scale=1.0, int width=1):
+    """
+    Decode a BYTE (width=1) or little-endian WORD (width=2) waveform block
+    to volts and return (mean, rms, volts) in a single pass over the samples.
+    """
+    cdef Py_ssize_t start, nbytes, n, i
+    start, nbytes = parse_block_header(payload)
+    n = nbytes // width
+
+    out_arr = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return 0.0, 0.0, out_arr
+
+    cdef double[::1] out = out_arr
+    cdef const unsigned char[::1] raw = payload[start:start + nbytes]
+    # (raw - yref) * yinc + yorig, folded into one multiply-add
+    cdef double a = yinc * scale
+    cdef double b = (yorig - yref * yinc) * scale
+    cdef double s = 0.0
+    cdef double ss = 0.0
+    cdef double v
+
+    if width == 2:
+        for i in prange(n, nogil=True, schedule="static"):
+            v = (raw[2 * i] | (<unsigned int>raw[2 * i + 1] << 8)) * a + b
+            out[i] = v
+            s += v
+            ss += v * v
+    else:
+        for i in prange(n, nogil=True, schedule="static"):
+            v = raw[i] * a + b
+            out[i] = v
+            s += v
+            ss += v * v
+
+    return s / n, sqrt(ss / n), out_arr
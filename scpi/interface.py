@@ -9,6 +9,9 @@ from config import BLACKLISTED_COMMANDS
 
 scpi_lock = threading.Lock()
 
+# *IDN? replies keyed by id(scope); the identity never changes per session
+_idn_cache = {}
+
 def connect_scope(ip):
     try:
         rm = pyvisa.ResourceManager()
@@ -26,6 +29,7 @@ def connect_scope(ip):
         # Quick test
         idn = scope.query("*IDN?")
         log_debug(f"✅ Connected: {idn}")
+        _idn_cache[id(scope)] = idn.strip()
 
         return scope
 
@@ -62,6 +66,17 @@ def safe_query(scope, command, default="N/A"):
     finally:
         app_state.is_scpi_busy = False
 
+def get_idn(scope, default="N/A"):
+    """Return the scope's *IDN? string, querying it at most once per handle."""
+    if scope is None:
+        return default
+    idn = _idn_cache.get(id(scope))
+    if idn is None:
+        idn = safe_query(scope, "*IDN?", default)
+        if idn != default:
+            _idn_cache[id(scope)] = idn
+    return idn
+
 def safe_write(scope, command, wait_opc=True, default_ok="OK"):
     """
     Send a write-only SCPI command. Optionally block on *OPC? for completion.
@@ -82,6 +97,9 @@ def safe_write(scope, command, wait_opc=True, default_ok="OK"):
     try:
         app_state.is_scpi_busy = True
         scope.write(command)
+        # Any write may change a setting the export header caches
+        from scpi.settings_cache import invalidate
+        invalidate(scope)
         if wait_opc:
             # Synchronize and also produce a short, visible response in the console
             resp = scope.query("*OPC?").strip()
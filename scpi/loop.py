@@ -4,7 +4,7 @@ import time
 import threading
 import app.app_state as app_state
 
-from scpi.interface import connect_scope, safe_query, scpi_lock
+from scpi.interface import connect_scope, safe_query, get_idn, scpi_lock
 from scpi.data import scpi_data
 from utils.debug import log_debug, set_debug_level
 from config import INTERVALL_SCPI
@@ -36,7 +36,7 @@ def start_scpi_loop(ip):
             return
 
         scpi_data["connected"] = True
-        scpi_data["idn"] = safe_query(scope, "*IDN?", "N/A")
+        scpi_data["idn"] = get_idn(scope, "N/A")
         log_debug(f"🔗 SCPI Loop connected: {scpi_data['idn']}")
 
         try:
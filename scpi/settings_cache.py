@@ -0,0 +1,79 @@
+# scpi/settings_cache.py
+"""
+Short-lived cache for scope settings that only change when someone turns a
+knob (timebase, channel scale/offset/probe, display state).
+
+Entries are keyed per scope handle and command and expire after `ttl`
+seconds, so front-panel changes show up within a couple of seconds.
+safe_write() invalidates the scope's entries on every write, so settings
+changed from this app are re-read right away.
+
+Do not cache values that change on their own (trigger status, measurements).
+"""
+
+import time
+import threading
+
+from scpi.interface import safe_query, multi_query
+
+# (id(scope), command) -> (value, monotonic timestamp)
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_cached(scope, cmd, ttl=2.0, default="N/A"):
+    """
+    Return (value, timestamp) for `cmd`, querying the scope only when the
+    cached reply is older than `ttl` seconds.
+    """
+    key = (id(scope), cmd)
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(key)
+    if hit is not None and now - hit[1] < ttl:
+        return hit
+
+    value = safe_query(scope, cmd, default)
+    with _cache_lock:
+        _cache[key] = (value, now)
+    return value, now
+
+
+def get_cached_many(scope, commands, ttl=2.0, defaults=None):
+    """
+    Like get_cached() for several commands; the stale ones are fetched in
+    a single chained query via multi_query(). Returns the values only.
+    """
+    if defaults is None:
+        defaults = ["N/A"] * len(commands)
+
+    now = time.monotonic()
+    values = [None] * len(commands)
+    missing = []
+    with _cache_lock:
+        for i, cmd in enumerate(commands):
+            hit = _cache.get((id(scope), cmd))
+            if hit is not None and now - hit[1] < ttl:
+                values[i] = hit[0]
+            else:
+                missing.append(i)
+
+    if missing:
+        fetched = multi_query(scope, [commands[i] for i in missing],
+                              [defaults[i] for i in missing])
+        with _cache_lock:
+            for i, value in zip(missing, fetched):
+                values[i] = value
+                _cache[(id(scope), commands[i])] = (value, now)
+    return values
+
+
+def invalidate(scope=None):
+    """Drop cached settings for one scope handle, or for all if scope is None."""
+    with _cache_lock:
+        if scope is None:
+            _cache.clear()
+            return
+        sid = id(scope)
+        for key in [k for k in _cache if k[0] == sid]:
+            del _cache[key]
@@ -0,0 +1,72 @@
+# scpi/wave_io.py
+"""
+Decode path for :WAV:DATA? BYTE/WORD blocks.
+
+The scope answers with an IEEE 488.2 definite-length block ('#N<len><data>\\n').
+decode_and_stats() strips that header, converts the samples to volts and
+returns (mean, rms, volts) in one pass; block_samples() returns the bare
+integer samples for callers that reduce them directly. Pass width=2 for
+:WAV:FORM WORD transfers.
+
+A compiled kernel lives in scpi/_wave_io.pyx. Build it in place with
+    cythonize -i scpi/_wave_io.pyx
+Without a compiler the NumPy fallback below is used transparently.
+"""
+
+import numpy as np
+
+try:
+    from scpi._wave_io import decode_and_stats, parse_block_header
+    HAVE_COMPILED = True
+except ImportError:
+    HAVE_COMPILED = False
+
+    def parse_block_header(payload):
+        """Return (start, count) of the sample bytes inside a '#N<len>' block."""
+        if len(payload) < 2 or payload[0] != 0x23:  # '#'
+            raise ValueError("Missing IEEE 488.2 block header")
+
+        ndig = payload[1] - 0x30
+        if not 0 <= ndig <= 9:
+            raise ValueError("Malformed IEEE 488.2 block header")
+
+        start = 2 + ndig
+        if ndig == 0:
+            # Indefinite-length block: runs up to the terminator
+            count = len(payload) - start
+            if count > 0 and payload[-1] == 0x0A:
+                count -= 1
+            return start, count
+
+        # Same checks as the compiled parser, so both builds agree
+        if len(payload) < start:
+            raise ValueError("Truncated IEEE 488.2 block header")
+        digits = bytes(payload[2:start])
+        if not digits.isdigit():
+            raise ValueError("Malformed IEEE 488.2 block header")
+        return start, min(int(digits), len(payload) - start)
+
+    def decode_and_stats(payload, yref, yinc, yorig, scale=1.0, width=1):
+        """
+        Decode a BYTE (width=1) or little-endian WORD (width=2) waveform
+        block to volts and return (mean, rms, volts).
+        """
+        raw = block_samples(payload, width)
+        n = raw.shape[0]
+
+        # (raw - yref) * yinc + yorig, folded into one multiply-add
+        volts = raw * (yinc * scale) + (yorig - yref * yinc) * scale
+        if n == 0:
+            return 0.0, 0.0, volts
+
+        return float(volts.mean()), float(np.sqrt(np.dot(volts, volts) / n)), volts
+
+
+def block_samples(payload, width=1):
+    """
+    Zero-copy view of the samples inside a :WAV:DATA? block: uint8 for
+    BYTE (width=1), little-endian uint16 for WORD (width=2).
+    """
+    start, nbytes = parse_block_header(payload)
+    dtype = np.dtype("<u2") if width == 2 else np.uint8
+    return np.frombuffer(payload, dtype=dtype, count=nbytes // width, offset=start)
@@ -2,16 +2,26 @@
 
 import os
 import time
-import csv
 import math
 import numpy as np
 import app.app_state as app_state
+from concurrent.futures import ThreadPoolExecutor
 
 from utils.debug import log_debug
-from config import WAV_POINTS
-from scpi.interface import safe_query, scpi_lock
+from config import WAV_POINTS, WAV_FORMAT
+from scpi.interface import safe_query, multi_query, get_idn, scpi_lock
+from scpi.settings_cache import get_cached_many
+from scpi.wave_io import decode_and_stats, block_samples
 from scpi.power_formulas import compute_power_standard, compute_power_rms_cos_phi
 
+# Bytes per sample for the configured :WAV:FORM (WORD = little-endian uint16)
+_SAMPLE_WIDTH = 2 if WAV_FORMAT == "WORD" else 1
+_YREF_MAX = 65535 if _SAMPLE_WIDTH == 2 else 255
+
+# Points per :WAV:STAR/:WAV:STOP window for large (RAW) BYTE transfers. The
+# scope caps one read in bytes, so WORD windows hold half as many points
+WAV_CHUNK_POINTS = int(os.getenv("WAV_CHUNK_POINTS", "250000"))
+_WINDOW_POINTS = max(1, WAV_CHUNK_POINTS // _SAMPLE_WIDTH)
 
 def _normalize_channel(ch):
     """Consistent channel normalization across all functions."""
@@ -21,10 +31,106 @@ def _normalize_channel(ch):
     return f"CHAN{s}"
 
 
-def _fetch_wave(scope, channel: str, use_raw: bool):
+def _wait_stopped(scope, timeout=0.5, poll=0.01):
     """
-    Unified waveform fetch function with consistent scaling between NORM and RAW modes.
-    Returns (t, y_volts, xinc) for the given channel.
+    Poll :TRIGger:STATus? until acquisition has halted ("STOP"; "TD" only
+    means triggered), instead of sleeping for the worst case. Returns True
+    once stopped, False on timeout. Queries the handle directly rather
+    than through safe_query(), so a slow reply never blacklists the
+    command for later fetches. Caller must hold scpi_lock.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if scope.query(":TRIGger:STATus?").strip().upper() == "STOP":
+                return True
+        except Exception as e:
+            log_debug(f"⚠️ :TRIGger:STATus? poll failed: {e}")
+        time.sleep(poll)
+    return False
+
+
+def _query_pre_settled(scope):
+    """
+    Block on *OPC? until the pending :WAV:* setup writes have completed,
+    then read :WAV:PRE? once. Returns the split fields.
+    Caller must hold scpi_lock.
+    """
+    scope.query("*OPC?")
+    return scope.query(":WAV:PRE?").split(",")
+
+
+def _read_block(scope, pre_data):
+    """Read one :WAV:DATA? block as-is. Caller must hold scpi_lock."""
+    scope.write(":WAV:DATA?")
+    return scope.read_raw()
+
+
+def _read_decoded_windows(scope, pre_data, chunk=None):
+    """
+    Read the current source in :WAV:STAR/:WAV:STOP windows and return the
+    decoded volts. Each window is decoded on a worker thread while the next
+    one is in flight (double buffering). A short window is not the end of
+    the record: the next window starts at the first point not yet read.
+    Caller must hold scpi_lock.
+    """
+    chunk = chunk or _WINDOW_POINTS
+    xinc, xorig, yinc, yorig, yref = pre_data
+    total = int(scope.query(":WAV:POIN?"))
+
+    if total <= chunk:
+        _, _, y = decode_and_stats(_read_block(scope, pre_data), yref, yinc, yorig, width=_SAMPLE_WIDTH)
+        return y
+
+    out = np.empty(total, dtype=np.float64)
+    gain = yinc
+    offset = yorig - yref * yinc
+
+    def decode_into(raw, pos):
+        dst = out[pos:pos + len(raw)]
+        np.multiply(raw, gain, out=dst)
+        dst += offset
+
+    # `out` is filled strictly in order, so out[:filled] is always fully
+    # written; a window that returns nothing ends the read there
+    filled = 0
+    pending = None
+    try:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            while filled < total:
+                start = filled + 1
+                stop = min(filled + chunk, total)
+                scope.write(f":WAV:STAR {start}")
+                scope.write(f":WAV:STOP {stop}")
+                raw = block_samples(_read_block(scope, pre_data), _SAMPLE_WIDTH)
+                expected = stop - start + 1
+                if len(raw) != expected:
+                    log_debug("⚠️ Window at %d: got %d samples, expected %d", start, len(raw), expected)
+                    raw = raw[:expected]
+                if len(raw) == 0:
+                    break
+                if pending is not None:
+                    pending.result()
+                pending = pool.submit(decode_into, raw, filled)
+                filled += len(raw)
+            if pending is not None:
+                pending.result()
+    finally:
+        # Leave the full record selected for the next reader
+        scope.write(":WAV:STAR 1")
+        scope.write(f":WAV:STOP {total}")
+
+    if filled < total:
+        log_debug("⚠️ Windowed read stopped at %d of %d points", filled, total)
+    return out[:filled]
+
+
+def _fetch_raw(scope, channel: str, use_raw: bool, read=_read_block):
+    """
+    Configure the waveform source and pull its data with read(scope, pre).
+    Returns (data, (xinc, xorig, yinc, yorig, yref)) where data is whatever
+    read returns (by default the raw IEEE 488.2 block as read from VISA),
+    or (None, None) on failure.
     """
     RAW_MAX_POINTS = int(os.getenv("RAW_MAX_POINTS", "5000000"))
     
@@ -33,22 +139,13 @@ def _fetch_wave(scope, channel: str, use_raw: bool):
 
     try:
         with scpi_lock:
-            # Query channel settings for validation; skip for MATH sources
-            is_math = channel.startswith("MATH")
-            if not is_math:
-                chan_scale = float(safe_query(scope, f":{channel}:SCALe?", "1.0"))
-                chan_offset = float(safe_query(scope, f":{channel}:OFFSet?", "0.0"))
-            else:
-                chan_scale = 1.0
-                chan_offset = 0.0
-            
-            scope.write(":WAV:FORM BYTE")
+            scope.write(f":WAV:FORM {WAV_FORMAT}")
 
             if use_raw:
                 # RAW mode: stop scope and optimize I/O
                 try: 
                     scope.write(":STOP")
-                    time.sleep(0.1)
+                    _wait_stopped(scope)
                 except Exception: 
                     pass
                     
@@ -85,10 +182,7 @@ def _fetch_wave(scope, channel: str, use_raw: bool):
             pre_data = None
             for attempt in range(3):
                 try:
-                    scope.query(":WAV:PRE?")  # Prime the query
-                    time.sleep(0.1 if use_raw else 0.05)
-                    
-                    pre = scope.query(":WAV:PRE?").split(",")
+                    pre = _query_pre_settled(scope)
                     
                     if len(pre) >= 10:
                         xinc = float(pre[4])
@@ -99,7 +193,7 @@ def _fetch_wave(scope, channel: str, use_raw: bool):
                         
                         # Validate PRE data
                         if (xinc > 0 and abs(yinc) > 1e-12 and 
-                            0 <= yref <= 255 and abs(yorig) < 1e6):
+                            0 <= yref <= _YREF_MAX and abs(yorig) < 1e6):
                             pre_data = (xinc, xorig, yinc, yorig, yref)
                             break
                         else:
@@ -111,52 +205,37 @@ def _fetch_wave(scope, channel: str, use_raw: bool):
             
             if pre_data is None:
                 log_debug("Failed to get valid PRE data")
-                return None, None, None
+                return None, None
                 
             xinc, xorig, yinc, yorig, yref = pre_data
 
             # Debug logging
-            log_debug(f"{channel} {'RAW' if use_raw else 'NORM'} PRE: xinc={xinc:.2e}, yinc={yinc:.2e}, yref={yref}, yorig={yorig:.2e}")
-            if not is_math:
-                log_debug(f"{channel} Settings: scale={chan_scale}V/div, offset={chan_offset}V")
+            log_debug("%s %s PRE: xinc=%.2e, yinc=%.2e, yref=%s, yorig=%.2e",
+                      channel, 'RAW' if use_raw else 'NORM', xinc, yinc, yref, yorig)
 
-            # Fetch waveform data
+            # Fetch the data; header parsing and decode happen in wave_io
             t0 = time.time()
-            raw = scope.query_binary_values(":WAV:DATA?", datatype='B', container=np.array)
+            payload = read(scope, pre_data)
             dt = time.time() - t0
 
-        if raw is None or len(raw) == 0:
-            return None, None, None
+        if payload is None or len(payload) == 0:
+            return None, None
 
         # Log transfer performance for RAW mode
         if use_raw:
             try:
-                mb = len(raw) / (1024.0 * 1024.0)
+                nbytes = len(payload) * _SAMPLE_WIDTH if isinstance(payload, np.ndarray) else len(payload)
+                mb = nbytes / (1024.0 * 1024.0)
                 rate = (mb / dt) if dt > 0 else 0.0
-                log_debug(f"RAW/{channel}: {len(raw)} pts ({mb:.1f} MiB) in {dt:.2f}s -> {rate:.2f} MiB/s")
+                log_debug(f"RAW/{channel}: {nbytes} bytes ({mb:.1f} MiB) in {dt:.2f}s -> {rate:.2f} MiB/s")
             except Exception:
                 pass
 
-        # Convert to voltage with validation
-        t = xorig + np.arange(len(raw)) * xinc
-        y = (raw.astype(np.float64) - yref) * yinc + yorig
-        
-        # Sanity check: compare with expected range (skip for MATH channels)
-        if not is_math:
-            expected_range = chan_scale * 8  # ±4 divisions
-            actual_range = np.ptp(y)
-            scale_ratio = actual_range / expected_range if expected_range > 0 else 1.0
-            
-            log_debug(f"{channel} Range: expected~{expected_range:.3f}V, actual={actual_range:.3f}V, ratio={scale_ratio:.3f}")
-            
-            if scale_ratio > 10 or scale_ratio < 0.1:
-                log_debug(f"Suspicious scaling for {channel} - ratio {scale_ratio:.3f}")
-        
-        return t, y, xinc
+        return payload, pre_data
 
     except Exception as e:
-        log_debug(f"_fetch_wave({channel}, RAW={use_raw}) failed: {e}")
-        return None, None, None
+        log_debug(f"_fetch_raw({channel}, RAW={use_raw}) failed: {e}")
+        return None, None
 
     finally:
         # Restore I/O settings and resume acquisition
@@ -173,28 +252,90 @@ def _fetch_wave(scope, channel: str, use_raw: bool):
         except Exception:
             pass
 
+
+def _fetch_wave(scope, channel: str, use_raw: bool):
+    """
+    Unified waveform fetch function with consistent scaling between NORM and RAW modes.
+    Returns (t, y_volts, xinc) for the given channel.
+    """
+    try:
+        # Query channel settings for validation; skip for MATH sources
+        is_math = channel.startswith("MATH")
+        if not is_math:
+            scale_s, offset_s = multi_query(scope, [f":{channel}:SCALe?", f":{channel}:OFFSet?"], ["1.0", "0.0"])
+            chan_scale = float(scale_s)
+            chan_offset = float(offset_s)
+            log_debug("%s Settings: scale=%sV/div, offset=%sV", channel, chan_scale, chan_offset)
+
+        if use_raw:
+            # Large capture: windowed transfer, decoded while the next window is in flight
+            y, pre_data = _fetch_raw(scope, channel, use_raw, read=_read_decoded_windows)
+            if y is None:
+                return None, None, None
+            xinc, xorig, yinc, yorig, yref = pre_data
+        else:
+            payload, pre_data = _fetch_raw(scope, channel, use_raw)
+            if payload is None:
+                return None, None, None
+
+            xinc, xorig, yinc, yorig, yref = pre_data
+
+            # Convert to voltage (header strip + decode in one pass)
+            _, _, y = decode_and_stats(payload, yref, yinc, yorig, width=_SAMPLE_WIDTH)
+            if len(y) == 0:
+                return None, None, None
+
+        t = xorig + np.arange(len(y)) * xinc
+        
+        # Sanity check: compare with expected range (skip for MATH channels)
+        if not is_math:
+            expected_range = chan_scale * 8  # ±4 divisions
+            actual_range = np.ptp(y)
+            scale_ratio = actual_range / expected_range if expected_range > 0 else 1.0
+            
+            log_debug("%s Range: expected~%.3fV, actual=%.3fV, ratio=%.3f",
+                      channel, expected_range, actual_range, scale_ratio)
+            
+            if scale_ratio > 10 or scale_ratio < 0.1:
+                log_debug(f"Suspicious scaling for {channel} - ratio {scale_ratio:.3f}")
+        
+        return t, y, xinc
+
+    except Exception as e:
+        log_debug(f"_fetch_wave({channel}, RAW={use_raw}) failed: {e}")
+        return None, None, None
+
 def get_channel_waveform_data(scope, channel, use_simple_calc=True, retries=1):
     """
     Get basic waveform statistics for a channel.
     """
+    # wave_stats pulls in Numba/CuPy when installed; load them on the first
+    # stats request rather than at GUI startup
+    from utils.wave_stats import vpp_vavg_vrms
+
     chan = _normalize_channel(channel)
 
+    # Display state does not change between retries; ask once
+    if safe_query(scope, f":{chan}:DISP?") != "1":
+        log_debug(f"Channel {chan} not displayed")
+        return None, None, None
+
     for attempt in range(1, retries + 2):
         try:
-            if safe_query(scope, f":{chan}:DISP?") != "1":
-                log_debug(f"Channel {chan} not displayed")
-                return None, None, None
+            # Setup, preamble and data share one locked session
+            payload, pre_data = _fetch_raw(scope, chan, use_raw=False)
+            if payload is None:
+                log_debug(f"Empty waveform on attempt {attempt} for {chan}")
+                continue
 
-            # Use unified fetch function
-            t, volts, xinc = _fetch_wave(scope, chan, use_raw=False)
-            if volts is None or len(volts) == 0:
+            # Reduce the integer samples directly; no volts array is built
+            xinc, xorig, yinc, yorig, yref = pre_data
+            raw = block_samples(payload, _SAMPLE_WIDTH)
+            if len(raw) == 0:
                 log_debug(f"Empty waveform on attempt {attempt} for {chan}")
                 continue
 
-            vpp = volts.max() - volts.min()
-            vavg = volts.mean()
-            vrms = np.sqrt(np.mean(np.square(volts)))
-            return vpp, vavg, vrms
+            return vpp_vavg_vrms(raw, yref, yinc, yorig)
 
         except Exception as e:
             log_debug(f"Attempt {attempt} failed for {chan}: {e}")
@@ -208,14 +349,12 @@ def fetch_waveform_with_fallback(scope, chan, retries=1):
     def try_fetch(mode_label):
         try:
             with scpi_lock:
-                scope.write(":WAV:FORM BYTE")
+                scope.write(f":WAV:FORM {WAV_FORMAT}")
                 scope.write(f":WAV:MODE {mode_label}")
                 scope.write(":WAV:POIN:MODE RAW")
                 scope.write(f":WAV:POIN {WAV_POINTS}")
                 scope.write(f":WAV:SOUR {chan}")
-                scope.query(":WAV:PRE?")
-                time.sleep(0.1)
-                pre = scope.query(":WAV:PRE?").split(",")
+                pre = _query_pre_settled(scope)
                 xinc  = float(pre[4])
                 xorig = float(pre[5])
                 yinc  = float(pre[7])
@@ -230,7 +369,7 @@ def fetch_waveform_with_fallback(scope, chan, retries=1):
 
                 # Timed binary transfer
                 t0  = time.time()
-                raw = scope.query_binary_values(":WAV:DATA?", datatype='B', container=np.array)
+                raw = scope.query_binary_values(":WAV:DATA?", datatype='H' if _SAMPLE_WIDTH == 2 else 'B', container=np.array)
                 dt  = time.time() - t0
 
                 # Throughput / size log
@@ -284,28 +423,67 @@ def fetch_waveform_with_fallback(scope, chan, retries=1):
     else:
         raise RuntimeError("🛑 Both RAW and NORM fetch failed")
         
+def _gather_csv_metadata(scope, chan):
+    """
+    Collect the CSV header fields. Knob settings come from the settings
+    cache (one chained query for whatever is stale); the trigger status is
+    always read fresh.
+    """
+    keys = ["timebase", "scale", "offset", "display"]
+    commands = [":TIMebase:SCALe?", f":{chan}:SCALe?", f":{chan}:OFFSet?", f":{chan}:DISP?"]
+    defaults = ["N/A", "N/A", "N/A", "1"]
+
+    # Probe factor (skip for MATH channels)
+    if not chan.startswith("MATH"):
+        keys.append("probe")
+        commands.append(f":{chan}:PROB?")
+        defaults.append("1.0")
+
+    meta = dict(zip(keys, get_cached_many(scope, commands, defaults=defaults)))
+    meta["trigger"] = safe_query(scope, ":TRIGger:STATus?", "N/A")
+    meta["idn"] = get_idn(scope, "Unknown")
+    try:
+        meta["probe"] = float(meta.get("probe", 1.0))
+    except ValueError:
+        meta["probe"] = 1.0
+    return meta
+
+def _write_csv_rows(f, xorig, xinc, volts, chunk=65536):
+    """
+    Write 'time,volts' rows in slices, computing the linear time axis per
+    slice so no full-length time array is ever allocated.
+    """
+    for start in range(0, len(volts), chunk):
+        stop = min(start + chunk, len(volts))
+        t = xorig + np.arange(start, stop) * xinc
+        np.savetxt(f, np.column_stack((t, volts[start:stop])), fmt="%.9g", delimiter=",")
+
 def export_channel_csv(scope, channel, outdir="oszi_csv", retries=2):
     """
     Export channel waveform to CSV file.
     """
     # Normalize channel name consistently
     chan = _normalize_channel(channel)
-    is_math = chan.startswith("MATH")
+
+    # Header values in one batched round-trip, gathered once for all attempts
+    meta = _gather_csv_metadata(scope, chan)
+    if meta["display"] == "0":
+        log_debug(f"Channel {chan} not displayed")
+        return None
 
     for attempt in range(1, retries + 2):
         try:
-            # Use unified fetch function (NORM mode for CSV export)
-            t, volts, xinc = _fetch_wave(scope, chan, use_raw=False)
-            
-            if volts is None or len(volts) == 0:
+            # NORM mode for CSV export; the time axis is generated while writing
+            payload, pre_data = _fetch_raw(scope, chan, use_raw=False)
+            if payload is None:
                 log_debug(f"Empty waveform data on attempt {attempt} for {chan}")
                 continue
 
-            # Get probe factor (skip for MATH channels)
-            if is_math:
-                probe = 1.0
-            else:
-                probe = float(safe_query(scope, f":{chan}:PROB?", "1.0"))
+            xinc, xorig, yinc, yorig, yref = pre_data
+            _, _, volts = decode_and_stats(payload, yref, yinc, yorig, width=_SAMPLE_WIDTH)
+            if len(volts) == 0:
+                log_debug(f"Empty waveform data on attempt {attempt} for {chan}")
+                continue
 
             # Prepare output path
             os.makedirs(outdir, exist_ok=True)
@@ -314,19 +492,21 @@ def export_channel_csv(scope, channel, outdir="oszi_csv", retries=2):
             path = os.path.join(outdir, filename)
 
             # Write CSV with metadata
-            with open(path, "w", newline="") as f:
-                f.write(f"# Device: {safe_query(scope, '*IDN?', 'Unknown')}\n")
-                f.write(f"# Channel: {chan}\n")
-                f.write(f"# Timebase: {safe_query(scope, ':TIMebase:SCALe?', 'N/A')} s/div\n")
-                f.write(f"# Scale: {safe_query(scope, f':{chan}:SCALe?', 'N/A')} V/div\n")
-                f.write(f"# Offset: {safe_query(scope, f':{chan}:OFFSet?', 'N/A')} V\n")
-                f.write(f"# Trigger: {safe_query(scope, ':TRIGger:STATus?', 'N/A')}\n")
-                f.write(f"# Probe: {probe}x\n")
-                f.write(f"# Timestamp: {timestamp}\n")
-                
-                writer = csv.writer(f)
-                writer.writerow(["Time (s)", "Voltage (V)"])
-                writer.writerows(zip(t, volts))
+            header = (
+                f"# Device: {meta['idn']}\n"
+                f"# Channel: {chan}\n"
+                f"# Timebase: {meta['timebase']} s/div\n"
+                f"# Scale: {meta['scale']} V/div\n"
+                f"# Offset: {meta['offset']} V\n"
+                f"# Trigger: {meta['trigger']}\n"
+                f"# Probe: {meta['probe']}x\n"
+                f"# Timestamp: {timestamp}\n"
+                "Time (s),Voltage (V)\n"
+            )
+            # 1 MiB buffer: each savetxt slice lands in a handful of write() calls
+            with open(path, "w", newline="", buffering=1 << 20) as f:
+                f.write(header)
+                _write_csv_rows(f, xorig, xinc, volts)
 
             log_debug(f"Exported {chan} waveform to {path}")
             return path
@@ -364,7 +544,8 @@ def compute_power_from_scope(scope, voltage_ch, current_ch, remove_dc=True,
         # VOLT mode: scale is A/V (from Value/Corr)
         scale_eff = scale_req
 
-    log_debug(f"Current UNIT = {unit_i} | effective scale = {scale_eff:.6g} {'(A correction)' if unit_i=='AMP' else 'A/V'}")
+    log_debug("Current UNIT = %s | effective scale = %.6g %s",
+              unit_i, scale_eff, '(A correction)' if unit_i == 'AMP' else 'A/V')
 
     # Fetch both channels using unified function
     t_v, yv, xinc_v = _fetch_wave(scope, chan_v, use_25m_v)
@@ -378,7 +559,8 @@ def compute_power_from_scope(scope, voltage_ch, current_ch, remove_dc=True,
     i_vrms_volt = float(np.sqrt(np.mean((yi - np.mean(yi))**2)))
     i_peak_volt = float(np.ptp(yi))
     unit_label = "A" if unit_i == "AMP" else "V"
-    log_debug(f"{chan_i} pre-scale: Vrms={i_vrms_volt:.6g}{unit_label}, Vpp={i_peak_volt:.6g}{unit_label}")
+    log_debug("%s pre-scale: Vrms=%.6g%s, Vpp=%.6g%s",
+              chan_i, i_vrms_volt, unit_label, i_peak_volt, unit_label)
 
     # Convert current to amps
     i = yi * scale_eff
@@ -386,7 +568,7 @@ def compute_power_from_scope(scope, voltage_ch, current_ch, remove_dc=True,
 
     # Log post-scale current
     i_rms_amp = float(np.sqrt(np.mean((i - np.mean(i))**2)))
-    log_debug(f"{chan_i} post-scale: Irms={i_rms_amp:.6g}A (scale factor={scale_eff:.6g})")
+    log_debug("%s post-scale: Irms=%.6gA (scale factor=%.6g)", chan_i, i_rms_amp, scale_eff)
 
     # Align timebases if needed
     tol = max(1e-15, 1e-9 * max(xinc_v, xinc_i))
@@ -416,7 +598,7 @@ def compute_power_from_scope(scope, voltage_ch, current_ch, remove_dc=True,
         i_dc = np.mean(i)
         v = v - v_dc
         i = i - i_dc
-        log_debug(f"DC removed: V_dc={v_dc:.6g}V, I_dc={i_dc:.6g}A")
+        log_debug("DC removed: V_dc=%.6gV, I_dc=%.6gA", v_dc, i_dc)
 
     # Calculate power metrics
     Vrms = float(np.sqrt(np.mean(v**2)))
@@ -477,9 +659,10 @@ def compute_power_from_scope(scope, voltage_ch, current_ch, remove_dc=True,
     phase_deg_signed = phase_deg if sign_q >= 0 else -phase_deg
 
 
-    log_debug(f"Results: P={P:.6g}W | S={S:.6g}VA | Q={Q:.6g}VAr | PF={PF:.6g} | angle={phase_deg_signed:.4g}° ({'inductive' if sign_q >= 0 else 'capacitive'})")
+    log_debug("Results: P=%.6gW | S=%.6gVA | Q=%.6gVAr | PF=%.6g | angle=%.4g° (%s)",
+              P, S, Q, PF, phase_deg_signed, 'inductive' if sign_q >= 0 else 'capacitive')
     scale_label = "A-corr" if unit_i == "AMP" else "A/V"
-    log_debug(f"Final: Vrms={Vrms:.6g}V | Irms={Irms:.6g}A | scale_used={scale_eff:.6g}{scale_label}")
+    log_debug("Final: Vrms=%.6gV | Irms=%.6gA | scale_used=%.6g%s", Vrms, Irms, scale_eff, scale_label)
 
     return {
         "Time": t,
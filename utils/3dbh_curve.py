@@ -3,6 +3,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import sys
 import os
+import warnings
 from collections import Counter
 
 def load_bh_csv(path, cycle=None):
@@ -10,39 +11,40 @@ def load_bh_csv(path, cycle=None):
     Load H, B from a log file with: run_index, time_iso, H, B
     Optionally only for a specific run_index (cycle).
     """
-    runidx = []
-    H = []
-    B = []
-    with open(path, "r") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = [p.strip() for p in line.split(",")]
-            if len(parts) < 4:
-                continue
-            try:
-                idx = int(parts[0])
-                h = float(parts[2])
-                b = float(parts[3])
-            except Exception:
-                continue
-            if (cycle is None) or (idx == cycle):
-                runidx.append(idx)
-                H.append(h)
-                B.append(b)
-    return np.array(H), np.array(B), np.array(runidx)
+    def data_lines(f):
+        # Data rows start with the run index; this drops the '#' header rows
+        # (csv.writer quotes the one containing commas) and blank separators.
+        return (line for line in f if line[:1].isdigit())
+
+    with open(path, "r") as f, warnings.catch_warnings():
+        # An empty log is not worth a warning; main() reports the point count.
+        warnings.simplefilter("ignore")
+        try:
+            arr = np.loadtxt(data_lines(f), delimiter=",", usecols=(0, 2, 3),
+                             ndmin=2)
+        except ValueError:
+            # Hand-edited or truncated logs: skip malformed rows instead of failing
+            f.seek(0)
+            arr = np.genfromtxt(data_lines(f), delimiter=",", usecols=(0, 2, 3),
+                                invalid_raise=False, ndmin=2)
+            arr = arr[~np.isnan(arr).any(axis=1)]
+
+    runidx = arr[:, 0].astype(int)
+    if cycle is not None:
+        mask = runidx == cycle
+        arr, runidx = arr[mask], runidx[mask]
+    return arr[:, 1], arr[:, 2], runidx
 
 def robust_clip(H, B, factor=5):
     """
     Remove points where H or B are >factor*median absolute value (outlier filter)
     """
-    abs_H = np.abs(H)
-    abs_B = np.abs(B)
-    h_med = np.median(abs_H)
-    b_med = np.median(abs_B)
-    mask = (abs_H < factor*h_med) & (abs_B < factor*b_med)
-    return H[mask], B[mask]
+    # One |x| buffer and one mask, reused for both channels
+    buf = np.abs(H)
+    mask = buf < factor * np.median(buf)
+    np.abs(B, out=buf)
+    np.logical_and(mask, buf < factor * np.median(buf), out=mask)
+    return np.compress(mask, H), np.compress(mask, B)
 
 def plot_bh_2d(H, B, ax=None, label="BH-curve"):
     if ax is None:
@@ -0,0 +1,149 @@
+# utils/_spline_numba.py
+"""
+Natural cubic spline used by the --spline overlays in plot_rigol_csv.py.
+
+eval_cubic(x, y, xq, out=None) fits a natural cubic spline through (x, y)
+and evaluates it at xq, optionally into a preallocated float64 `out`.
+x must be strictly increasing.
+
+With Numba installed the tridiagonal solve and the Horner evaluation are
+JIT-compiled (cached on disk after the first run); otherwise SciPy's
+CubicSpline with natural end conditions gives the same curve.
+
+Evenly spaced x (logs written at a fixed interval) take a shortcut: the
+system matrix is then tridiag(1, 4, 1) up to a factor, so its Thomas
+factors depend only on the size and are computed once per size.
+"""
+
+import functools
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def solve_tridiag(a, b, c, d):
+        """
+        Thomas algorithm for a tridiagonal system. a is the sub-diagonal
+        (a[0] unused), b the diagonal, c the super-diagonal (c[-1] unused).
+        """
+        n = d.shape[0]
+        cp = np.empty(n)
+        dp = np.empty(n)
+        cp[0] = c[0] / b[0]
+        dp[0] = d[0] / b[0]
+        for i in range(1, n):
+            m = b[i] - a[i] * cp[i - 1]
+            cp[i] = c[i] / m
+            dp[i] = (d[i] - a[i] * dp[i - 1]) / m
+        out = np.empty(n)
+        out[n - 1] = dp[n - 1]
+        for i in range(n - 2, -1, -1):
+            out[i] = dp[i] - cp[i] * out[i + 1]
+        return out
+
+    @njit(cache=True, fastmath=True)
+    def _second_derivs(x, y):
+        """Second derivatives at the knots, zero at both ends (natural)."""
+        n = x.shape[0]
+        m2 = np.zeros(n)
+        if n < 3:
+            return m2
+        h = np.diff(x)
+        k = n - 2
+        a = np.empty(k)
+        b = np.empty(k)
+        c = np.empty(k)
+        d = np.empty(k)
+        for i in range(k):
+            a[i] = h[i]
+            b[i] = 2.0 * (h[i] + h[i + 1])
+            c[i] = h[i + 1]
+            d[i] = 6.0 * ((y[i + 2] - y[i + 1]) / h[i + 1] - (y[i + 1] - y[i]) / h[i])
+        m2[1:n - 1] = solve_tridiag(a, b, c, d)
+        return m2
+
+    @njit(cache=True)
+    def _uniform_factors(k):
+        """
+        Thomas factors of the k x k matrix tridiag(1, 4, 1): the reciprocal
+        pivots, which for unit off-diagonals are also the c' coefficients.
+        """
+        inv = np.empty(k)
+        inv[0] = 0.25
+        for i in range(1, k):
+            inv[i] = 1.0 / (4.0 - inv[i - 1])
+        return inv
+
+    @njit(cache=True, fastmath=True)
+    def _second_derivs_uniform(y, h, inv):
+        """_second_derivs() for knots spaced h apart, using cached factors."""
+        n = y.shape[0]
+        k = n - 2
+        m2 = np.zeros(n)
+        scale = 6.0 / (h * h)
+        dp = np.empty(k)
+        dp[0] = scale * (y[2] - 2.0 * y[1] + y[0]) * inv[0]
+        for i in range(1, k):
+            d = scale * (y[i + 2] - 2.0 * y[i + 1] + y[i])
+            dp[i] = (d - dp[i - 1]) * inv[i]
+        m2[k] = dp[k - 1]
+        for i in range(k - 2, -1, -1):
+            m2[i + 1] = dp[i] - inv[i] * m2[i + 2]
+        return m2
+
+    @functools.lru_cache(maxsize=16)
+    def _cached_uniform_factors(k):
+        inv = _uniform_factors(k)
+        inv.flags.writeable = False
+        return inv
+
+    @njit(cache=True, fastmath=True)
+    def _eval_cubic(x, y, m2, xq, out):
+        n = x.shape[0]
+        for k in range(xq.shape[0]):
+            i = np.searchsorted(x, xq[k]) - 1
+            if i < 0:
+                i = 0
+            elif i > n - 2:
+                i = n - 2
+            h = x[i + 1] - x[i]
+            # Per-interval polynomial in dx, evaluated in Horner form
+            c1 = (y[i + 1] - y[i]) / h - h * (2.0 * m2[i] + m2[i + 1]) / 6.0
+            c2 = 0.5 * m2[i]
+            c3 = (m2[i + 1] - m2[i]) / (6.0 * h)
+            dx = xq[k] - x[i]
+            out[k] = y[i] + dx * (c1 + dx * (c2 + dx * c3))
+        return out
+
+    def eval_cubic(x, y, xq, out=None):
+        """Natural cubic spline through (x, y), evaluated at xq."""
+        # One dtype signature, so the on-disk JIT cache is reused
+        x = np.ascontiguousarray(x, dtype=np.float64)
+        y = np.ascontiguousarray(y, dtype=np.float64)
+        xq = np.ascontiguousarray(xq, dtype=np.float64)
+        if out is None:
+            out = np.empty(xq.shape[0])
+
+        n = x.shape[0]
+        h = (x[-1] - x[0]) / (n - 1) if n > 1 else 0.0
+        if n >= 3 and h > 0.0 and np.allclose(np.diff(x), h, rtol=1e-9, atol=0.0):
+            m2 = _second_derivs_uniform(y, h, _cached_uniform_factors(n - 2))
+        else:
+            m2 = _second_derivs(x, y)
+        return _eval_cubic(x, y, m2, xq, out)
+else:
+    def eval_cubic(x, y, xq, out=None):
+        """Natural cubic spline through (x, y), evaluated at xq (SciPy fallback)."""
+        from scipy.interpolate import CubicSpline
+        y_q = CubicSpline(np.asarray(x, dtype=np.float64),
+                          np.asarray(y, dtype=np.float64),
+                          bc_type="natural")(xq)
+        if out is None:
+            return y_q
+        out[:] = y_q
+        return out
@@ -8,8 +8,9 @@ for showing recent messages in the GUI's "Debug Log" tab.
 Design goals
 ------------
 • Zero-risk for measurement paths: logging never raises upstream.
-• Thread-safe enough for this app: writers append to a bounded deque; the GUI
-  reader runs on Tk's main thread via `after()`.
+• Thread-safe enough for this app: writers append to a bounded deque and a
+  small pending batch; the GUI reader swaps that batch out on Tk's main
+  thread via `after()`.
 • Graceful teardown: the updater stops itself cleanly when the window closes
   or the app enters shutdown.
 
@@ -19,8 +20,10 @@ set_debug_level(level: str)
     Set global filter: "FULL" (default) or "MINIMAL". Messages logged with
     level="MINIMAL" always pass; any other level is suppressed when in MINIMAL.
 
-log_debug(message: str, level: str = "FULL")
-    Timestamp + append the message to the ring buffer and also print to stdout.
+log_debug(fmt: str, *args, level: str = "FULL")
+    Timestamp + append the message to the ring buffer and also print to stdout
+    (batched per GUI tick while the updater is running).
+    With args, the message is `fmt % args`, built only if it passes the filter.
 
 attach_debug_widget(widget: tk.Text)
     Provide the Text widget where logs should appear. (The module does not
@@ -29,7 +32,7 @@ attach_debug_widget(widget: tk.Text)
 start_debug_updater(root: tk.Tk)
     Starts a recurring GUI update (~4 Hz). It:
       - stops automatically during teardown,
-      - shows only the most recent ~500 lines to keep UI responsive,
+      - appends only new lines and keeps the most recent ~500 visible,
       - unhooks yscrollcommand on destroy to avoid "...scroll" Tcl errors.
 
 Notes
@@ -39,7 +42,10 @@ Notes
 • Do not import Tkinter here in tight inner loops—only at module scope as done.
 """
 
+import sys
 import time
+import atexit
+import threading
 from collections import deque
 import tkinter as tk
 
@@ -61,6 +67,20 @@ DEBUG_LEVEL = "FULL"
 # Stores the current `after()` callback id so we can cancel it during shutdown.
 _debug_after_id = [None]
 
+# Lines shown in the widget; older ones are trimmed from the top.
+_TAIL_LINES = 500
+
+# Lines logged since the last GUI tick. Producers append under the lock; the
+# updater swaps in a fresh deque and drains the old one outside it. Bounded so
+# CLI runs without a widget do not accumulate.
+_pending = deque(maxlen=_TAIL_LINES)
+_pending_lock = threading.Lock()
+
+# While the updater is scheduled, stdout copies are queued here (under
+# _pending_lock) and written in one go per GUI tick instead of one print per
+# message. Once it stops, log_debug() prints directly again.
+_stdout_pending = []
+
 
 # -------- Configuration -------------------------------------------------------
 
@@ -75,23 +95,66 @@ def set_debug_level(level):
 
 # -------- Logging entry point -------------------------------------------------
 
-def log_debug(message, level="FULL"):
+def log_debug(fmt, *args, level="FULL"):
     """
     Append a timestamped message to the ring buffer and print to stdout.
 
     Filtering:
       - If DEBUG_LEVEL == "MINIMAL", drop messages where level != "MINIMAL".
       - Otherwise, accept all messages.
+
+    Hot paths can pass printf-style args (log_debug("x=%.3f", x)) so the
+    string is only formatted when the message is kept. A plain message is
+    used as-is, so literal '%' in pre-formatted strings is safe.
     """
     if DEBUG_LEVEL == "MINIMAL" and level != "MINIMAL":
         return
+    if args:
+        try:
+            message = fmt % args
+        except (TypeError, ValueError):
+            # A bad format string must not raise into the caller
+            message = f"{fmt} {args!r}"
+    else:
+        message = fmt
     timestamp = time.strftime("%H:%M:%S")
     full_msg = f"[{timestamp}] {message}"
     debug_log.append(full_msg)
+    with _pending_lock:
+        _pending.append(full_msg)
+        if debug_widget is not None and _debug_after_id[0] is not None:
+            # GUI run: the stdout copy goes out with the next updater tick.
+            _stdout_pending.append(full_msg)
+            return
     # Keep stdout printing for CLI runs / log captures.
     print(full_msg)
 
 
+def _flush_stdout():
+    """Write queued stdout lines with a single write + flush."""
+    global _stdout_pending
+    with _pending_lock:
+        lines, _stdout_pending = _stdout_pending, []
+    if not lines:
+        return
+    try:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+    except Exception:
+        pass
+
+
+# Lines queued after the last GUI tick still reach stdout on exit.
+atexit.register(_flush_stdout)
+
+
+def _updater_stopped():
+    """Mark the updater as stopped and write out what it had queued."""
+    with _pending_lock:
+        _debug_after_id[0] = None
+    _flush_stdout()
+
+
 # -------- GUI wiring ----------------------------------------------------------
 
 def attach_debug_widget(widget):
@@ -122,35 +185,50 @@ def start_debug_updater(root):
         except Exception:
             shutting_down = False
 
-        # If shutting down or paused or not yet attached, do nothing.
+        _flush_stdout()
+
+        # If shutting down or paused or not yet attached, stop.
         if shutting_down or debug_widget is None or debug_paused:
+            _updater_stopped()
             return
 
         try:
             # Widget might have been destroyed while we were scheduled.
             if not debug_widget.winfo_exists():
+                _updater_stopped()
                 return
 
-            # Only show a tail to keep UI snappy (≈ last 500 lines).
-            tail = "\n".join(list(debug_log)[-500:])
+            # Take the pending batch in one swap so producers never wait on
+            # the widget; idle ticks leave the widget untouched.
+            global _pending
+            with _pending_lock:
+                batch, _pending = _pending, deque(maxlen=_TAIL_LINES)
+            if batch:
+                debug_widget.config(state=tk.NORMAL)
+                debug_widget.insert(tk.END, "\n".join(batch) + "\n")
 
-            debug_widget.config(state=tk.NORMAL)
-            debug_widget.delete(1.0, tk.END)
-            debug_widget.insert(tk.END, tail)
-            debug_widget.config(state=tk.DISABLED)
-            debug_widget.see(tk.END)
+                # Only show a tail to keep UI snappy (≈ last 500 lines).
+                shown = int(debug_widget.index("end-1c").split(".")[0]) - 1
+                if shown > _TAIL_LINES:
+                    debug_widget.delete("1.0", f"{shown - _TAIL_LINES + 1}.0")
+
+                debug_widget.config(state=tk.DISABLED)
+                debug_widget.see(tk.END)
 
         except tk.TclError:
             # Happens during teardown; silently stop.
+            _updater_stopped()
             return
 
         # Re-schedule next tick if still alive.
         try:
             if not shutting_down and debug_widget.winfo_exists():
                 _debug_after_id[0] = root.after(250, update_gui)  # ~4 Hz
+                return
         except tk.TclError:
             # Root/window is going away—stop rescheduling.
-            return
+            pass
+        _updater_stopped()
 
     # Schedule first tick.
     _debug_after_id[0] = root.after(250, update_gui)
@@ -160,9 +238,9 @@ def start_debug_updater(root):
         try:
             if _debug_after_id[0] is not None:
                 root.after_cancel(_debug_after_id[0])
-                _debug_after_id[0] = None
         except Exception:
             pass
+        _updater_stopped()
         # Unhook yscrollcommand to avoid late callbacks into a dead scrollbar.
         try:
             if debug_widget and debug_widget.winfo_exists():
@@ -2,7 +2,7 @@
 
 import os
 from datetime import datetime
-from scpi.interface import safe_query
+from scpi.interface import get_idn
 from app.app_state import scope
 
 def load_operator_info(path="utils/operator-info.txt"):
@@ -22,7 +22,7 @@ def collect_context_info(vch, ich, probe_type, scale, dc_remove):
 
     # Get scope ID
     try:
-        idn = safe_query(scope, "*IDN?", "N/A") if scope else "N/A"
+        idn = get_idn(scope, "N/A")
     except:
         idn = "N/A"
     context["Scope ID"] = idn
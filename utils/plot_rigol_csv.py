@@ -3,16 +3,36 @@
 
 import os
 import sys
+import functools
 import glob
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
 import argparse
-from scipy.interpolate import make_interp_spline
 import numpy as np
+try:
+    from utils._spline_numba import eval_cubic
+except ImportError:
+    # Run as a script (python utils/plot_rigol_csv.py): utils/ is on sys.path
+    from _spline_numba import eval_cubic
 from datetime import datetime
 
-def load_operator_info(path="utils/operator-info.txt"):
+# Optional: pyarrow's multi-threaded CSV reader (falls back to pandas' C engine)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+def _mtime_ns(path):
+    """Modification time used as cache key; None if the file is missing."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+@functools.lru_cache(maxsize=8)
+def _read_operator_info(path, mtime_ns):
     info = {}
     try:
         with open(path, "r") as f:
@@ -24,12 +44,13 @@ def load_operator_info(path="utils/operator-info.txt"):
         info["Metadata Error"] = f"Could not read {path}: {e}"
     return info
 
-def get_scope_info(path="utils/idn.txt"):
-    """
-    Try to load the scope info from a saved IDN string.
-    Fallback: fake data.
-    """
-    if os.path.isfile(path):
+def load_operator_info(path="utils/operator-info.txt"):
+    # Parsed once per file version; callers get their own copy to edit
+    return dict(_read_operator_info(path, _mtime_ns(path)))
+
+@functools.lru_cache(maxsize=8)
+def _read_scope_info(path, mtime_ns):
+    if mtime_ns is not None:
         try:
             with open(path, "r") as f:
                 line = f.read().strip()
@@ -44,75 +65,366 @@ def get_scope_info(path="utils/idn.txt"):
             pass
     return {"Model": "Unknown", "Serial": "Unknown", "FW": "Unknown"}
 
-def is_waveform_csv(path):
+def get_scope_info(path="utils/idn.txt"):
+    """
+    Try to load the scope info from a saved IDN string.
+    Fallback: fake data. Re-read only when the file changes.
+    """
+    return dict(_read_scope_info(path, _mtime_ns(path)))
+
+WAVEFORM_COLUMNS = frozenset({"Time (s)", "Voltage (V)"})
+POWER_COLUMNS = frozenset({"P (W)", "S (VA)", "Q (VAR)"})
+SESSION_COLUMNS = frozenset({"Timestamp"})
+
+def _header_columns(path):
+    """Column names from the first line after the '#' block, or None."""
     try:
-        df = pd.read_csv(path, comment="#", nrows=1)
-        return "Time (s)" in df.columns and "Voltage (V)" in df.columns
-    except Exception:
-        return False
+        with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+            header = next(line for line in f if line.strip() and not line.startswith("#"))
+    except (OSError, StopIteration):
+        return None
+    return [c.strip('"') for c in header.rstrip("\r\n").split(",")]
+
+def _classify(path):
+    """
+    Tell our CSV formats apart from the column header alone (the first line
+    after the '#' metadata block): "waveform", "power", "session" or None.
+    """
+    header = _header_columns(path)
+    if header is None:
+        return None
+    cols = frozenset(c.strip() for c in header)
+    # Power logs also carry a Timestamp column, so test them before session logs
+    if WAVEFORM_COLUMNS <= cols:
+        return "waveform"
+    if POWER_COLUMNS <= cols:
+        return "power"
+    if SESSION_COLUMNS <= cols:
+        return "session"
+    return None
+
+def is_waveform_csv(path):
+    return _classify(path) == "waveform"
 
 def is_session_log(path):
-    try:
-        df = pd.read_csv(path, nrows=1, comment="#", encoding="utf-8-sig")
-        return "Timestamp" in df.columns
-    except Exception:
-        return False
+    return _classify(path) in ("session", "power")
 
 def is_power_log(path):
+    return _classify(path) == "power"
+
+def _parse_waveform(path):
+    """
+    Load (time, voltage) float arrays from a waveform export with NumPy.
+    The '#' metadata block is skipped and the column header is checked with
+    a single line read; returns None if the header does not match.
+    """
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            if line.strip() and not line.startswith("#"):
+                break
+        else:
+            return None
+        cols = [c.strip() for c in line.split(",")]
+        if "Time (s)" not in cols or "Voltage (V)" not in cols:
+            return None
+        if pa is not None:
+            f.close()
+            df = _fast_read_csv(path, usecols=["Time (s)", "Voltage (V)"],
+                                dtype={"Time (s)": "float64", "Voltage (V)": "float64"})
+            return df["Time (s)"].to_numpy(), df["Voltage (V)"].to_numpy()
+        usecols = (cols.index("Time (s)"), cols.index("Voltage (V)"))
+        time_data, voltage = np.loadtxt(f, delimiter=",", comments="#",
+                                        usecols=usecols, unpack=True, ndmin=2)
+    return time_data, voltage
+
+def _leading_comment_rows(path):
+    """Count the '#' metadata lines above the CSV header."""
+    n = 0
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        for line in f:
+            if not line.startswith("#"):
+                break
+            n += 1
+    return n
+
+def _fast_read_csv(path, *, dtype=None, usecols=None, chunksize=None, arrow=True):
+    """
+    Read one of our CSV logs into a DataFrame, or an iterator of DataFrames
+    when chunksize is given. Uses pyarrow when installed: the '#' header
+    block is skipped by row count, `dtype` ({column: numpy dtype}) becomes
+    the Arrow column types and numeric columns convert to NumPy without a
+    copy. Otherwise (or with arrow=False) this is pd.read_csv's C engine.
+    """
+    if pa is None or not arrow:
+        return pd.read_csv(path, comment="#", encoding="utf-8-sig", usecols=usecols,
+                           dtype=dtype, chunksize=chunksize)
+
+    read_opts = pa_csv.ReadOptions(skip_rows=_leading_comment_rows(path))
+    parse_opts = pa_csv.ParseOptions(invalid_row_handler=lambda row: "skip")
+    convert_opts = pa_csv.ConvertOptions(
+        include_columns=usecols,
+        column_types={c: pa.from_numpy_dtype(np.dtype(t)) for c, t in (dtype or {}).items()},
+    )
+    if chunksize is not None:
+        # Arrow streams by block size in bytes; chunksize is only a hint here
+        reader = pa_csv.open_csv(path, read_options=read_opts, parse_options=parse_opts,
+                                 convert_options=convert_opts)
+        return (batch.to_pandas() for batch in reader)
     try:
-        df = pd.read_csv(path, nrows=1, comment="#", encoding="utf-8-sig")
-        needed = {"P (W)", "S (VA)", "Q (VAR)"}
-        return needed.issubset(set(df.columns))
-    except Exception:
-        return False
+        return pa_csv.read_csv(path, read_options=read_opts, parse_options=parse_opts,
+                               convert_options=convert_opts).to_pandas()
+    except pa.ArrowInvalid:
+        # e.g. a value Arrow cannot convert; pandas is more forgiving
+        return _fast_read_csv(path, dtype=dtype, usecols=usecols, arrow=False)
+
+def _figure_width_px(fig):
+    return max(1, int(fig.get_figwidth() * fig.dpi))
+
+class _PlotState:
+    """
+    Figure, axes and artists of one plot. Re-plotting the same file in the
+    same process (notebook, embedding) updates these artists in place with
+    set_data()/set_text() instead of building a new figure.
+    """
+    def __init__(self, figsize):
+        self.fig, self.ax = plt.subplots(figsize=figsize)
+        self.lines = {}
+        self.static = {}
+        self._drawn = set()
+
+    def line(self, key, x, y, **style):
+        """Draw or update the curve `key`; style only applies on creation."""
+        self._drawn.add(key)
+        line = self.lines.get(key)
+        if line is None:
+            line, = self.ax.plot(x, y, **style)
+            self.lines[key] = line
+        else:
+            line.set_data(x, y)
+            line.set_label(style.get("label"))
+        return line
+
+    def once(self, key, make):
+        """Artist `key`, created by make() on the first render only."""
+        if key not in self.static:
+            self.static[key] = make()
+        return self.static[key]
+
+    def finish(self):
+        """Remove curves not drawn this time and rescale to the new data."""
+        for key in [k for k in self.lines if k not in self._drawn]:
+            self.lines.pop(key).remove()
+        self._drawn = set()
+        self.ax.relim()
+        self.ax.set_autoscale_on(True)
+        self.ax.autoscale_view()
+
+_FIG_CACHE = {}
+
+def _plot_state(path, figsize):
+    """Cached _PlotState for `path`, or a new one if its window was closed."""
+    key = os.path.abspath(path)
+    state = _FIG_CACHE.get(key)
+    if state is None or not plt.fignum_exists(state.fig.number):
+        state = _FIG_CACHE[key] = _PlotState(figsize)
+    else:
+        # Make it current so the plt.* calls below target it
+        plt.figure(state.fig.number)
+    return state
+
+def _m4_downsample(t, v, n_out):
+    """
+    M4 reduction for line plots: split the samples into n_out buckets and
+    keep the first, min, max and last point of each, in time order. The
+    drawn line is pixel-identical to the full trace (every peak survives)
+    while the vertex count scales with the figure width, not the row count.
+    Inputs with at most 4*n_out samples are returned unchanged.
+    """
+    t = np.asarray(t)
+    v = np.asarray(v)
+    n = v.shape[0]
+    if n <= 4 * n_out:
+        return t, v
+
+    step = n // n_out
+    full = n_out * step
+    starts = np.arange(0, full, step)
+    rows = v[:full].reshape(n_out, step)
+    picks = [
+        starts,
+        starts + rows.argmin(axis=1),
+        starts + rows.argmax(axis=1),
+        starts + (step - 1),
+    ]
+    if full < n:
+        # Leftover samples form one more, shorter bucket
+        tail = v[full:]
+        picks.append(np.array([full, full + tail.argmin(), full + tail.argmax(), n - 1]))
+
+    idx = np.unique(np.concatenate(picks))
+    return t[idx], v[idx]
+
+def _elapsed_seconds(timestamps):
+    """
+    Return (t0, seconds since t0 as float64) for the spline x-axis, from one
+    int64 subtract on the nanosecond view. Sub-second spacing is kept, and
+    the result does not depend on the datetime unit pandas parsed into.
+    """
+    ts_ns = np.asarray(timestamps, dtype="datetime64[ns]")
+    if ts_ns.size == 0:
+        return None, np.empty(0)
+    t0 = ts_ns[0]
+    return t0, (ts_ns.view("int64") - t0.astype("int64")).astype(np.float64) * 1e-9
+
+def _seconds_to_time(t0, seconds):
+    """Inverse of _elapsed_seconds(): datetime64[ns] axis values."""
+    return t0 + (seconds * 1e9).astype("timedelta64[ns]")
+
+def _rolling_mean(a, w):
+    """
+    Centered moving average, equal to pandas rolling(w, center=True).mean()
+    but O(n) via a cumulative sum regardless of the window size. Keeps
+    float32 input in float32 (other input is computed as float64). NaN where
+    the window runs past either end or contains a NaN. Accepts a 1D array or
+    a 2D array with one column per channel (all columns in one pass).
+    """
+    a = np.asarray(a)
+    if a.dtype != np.float32:
+        a = a.astype(np.float64)
+    w = max(int(w), 1)
+    n = a.shape[0]
+    # float32 in, float32 out; the running sum itself is always float64
+    out = np.full(a.shape, np.nan, dtype=a.dtype)
+    if n < w:
+        return out
+
+    nan = np.isnan(a)
+    has_nan = nan.any()
+    zero = np.zeros((1,) + a.shape[1:])
+    c = np.concatenate([zero, np.cumsum(np.where(nan, 0.0, a) if has_nan else a,
+                                        axis=0, dtype=np.float64)])
+    means = (c[w:] - c[:-w]) / w
+    if has_nan:
+        bad = np.concatenate([zero, np.cumsum(nan, axis=0)])
+        means[(bad[w:] - bad[:-w]) > 0] = np.nan
+
+    # Window [k, k+w) is labelled at its centre, as pandas does
+    lead = w // 2
+    out[lead:lead + means.shape[0]] = means
+    return out
+
+SPLINE_POINTS = 300
+
+# Raw curves: thin, not antialiased, and rasterized in vector output
+# (PDF/SVG) so dense data costs one image instead of one path per segment.
+# Smoothed and spline overlays stay vector.
+RAW_STYLE = dict(rasterized=True, antialiased=False, linewidth=0.5)
+
+def _finite_rows(raw, y, window, smooth):
+    """
+    Index of the finite samples of y (raw, or its rolling mean if smooth).
+    For NaN/inf-free raw data the rolling mean is only NaN in its first
+    window//2 and last (window-1)//2 rows, so this is a plain slice and
+    no mask or fancy-indexed copy is needed; otherwise a boolean mask.
+    """
+    n = y.shape[0]
+    if np.isfinite(np.sum(raw, dtype=np.float64)):
+        if not smooth:
+            return slice(0, n)
+        w = max(int(window), 1)
+        if n < w:
+            return slice(0, 0)
+        return slice(w // 2, n - (w - 1 - w // 2))
+    return ~np.isnan(y)
+
+def _count_rows(rows):
+    """Number of rows selected by a _finite_rows() index."""
+    if isinstance(rows, slice):
+        return max(rows.stop - rows.start, 0)
+    return np.count_nonzero(rows)
+
+def _time_grid(x, rows, t0, grids, n_points):
+    """
+    (x_grid, axis_grid): n_points evenly spaced over the finite samples of
+    one column, and the same points as plot-axis values (datetimes when t0
+    is given). Columns share a span (smoothing trims the same rows from
+    each), so grids are cached in `grids` by span and size; every plot
+    builds each grid, and converts it to datetimes, only once.
+    """
+    if isinstance(rows, slice):
+        first, last = rows.start, rows.stop - 1
+    else:
+        idx = np.flatnonzero(rows)
+        first, last = idx[0], idx[-1]
+    key = (first, last, n_points)
+    grid = grids.get(key)
+    if grid is None:
+        x_grid = np.linspace(x[first], x[last], n_points)
+        axis = x_grid if t0 is None else _seconds_to_time(t0, x_grid)
+        grid = grids[key] = (x_grid, axis)
+    return grid
+
+def _smooth_curve(y, rows, axis, n_px):
+    """
+    The smoothed overlay reduced with _m4_downsample() for a plot n_px
+    pixels wide, so every peak of the curve survives while the renderer
+    gets a few vertices per pixel instead of every row. `rows` selects
+    the finite samples of y (see _finite_rows()) and `axis` holds the
+    plotted x values.
+    """
+    return _m4_downsample(np.asarray(axis)[rows], y[rows], n_px)
 
 def plot_waveform_csv(path, smooth=False, window=5, spline=False, scale=1.0):
     import os
-    import pandas as pd
     import matplotlib.pyplot as plt
     import numpy as np
-    from scipy.interpolate import make_interp_spline
 
     try:
-        df = pd.read_csv(path, comment="#")
-        if "Time (s)" not in df.columns or "Voltage (V)" not in df.columns:
+        columns = _parse_waveform(path)
+        if columns is None:
             print("❌ Invalid waveform CSV structure.")
             return
     except Exception as e:
         print(f"❌ Error reading waveform CSV: {e}")
         return
 
+    time_data, voltage_raw = columns
+    if time_data.size == 0:
+        print("⚠️ No samples found in waveform CSV.")
+        return
+
     # ⚠️ Apply user-defined scale (e.g. 0.1 for 10x probe or shunt scaling)
-    voltage_raw = df["Voltage (V)"]
     voltage_scaled = voltage_raw * scale
-    time_data = df["Time (s)"]
 
-    plt.figure(figsize=(12, 6))
-    plt.plot(time_data, voltage_scaled, label=f"{os.path.basename(path)} (scale ×{scale})", alpha=0.9)
+    state = _plot_state(path, figsize=(12, 6))
+    n_px = _figure_width_px(state.fig)
+    state.line("raw", *_m4_downsample(time_data, voltage_scaled, n_px),
+               label=f"{os.path.basename(path)} (scale ×{scale})", alpha=0.9, **RAW_STYLE)
 
     # Optional smoothing or spline interpolation
     if smooth or spline:
-        y = voltage_scaled.rolling(window=window, center=True).mean() if smooth else voltage_scaled
+        y = _rolling_mean(voltage_scaled, window) if smooth else voltage_scaled
         x = time_data
-
-        if spline and y.notna().sum() > 3:
-            x_vals = x[y.notna()]
-            y_vals = y[y.notna()]
-            x_smooth = np.linspace(x_vals.min(), x_vals.max(), 300)
-            spline_fit = make_interp_spline(x_vals, y_vals, k=3)
-            y_spline = spline_fit(x_smooth)
-            plt.plot(x_smooth, y_spline, linestyle="dotted", label="Spline Curve")
+        rows = _finite_rows(voltage_scaled, y, window, smooth)
+
+        if spline and _count_rows(rows) > 3:
+            x_vals = x[rows]
+            y_vals = y[rows]
+            x_smooth = np.linspace(x_vals.min(), x_vals.max(), SPLINE_POINTS)
+            y_spline = eval_cubic(x_vals, y_vals, x_smooth)
+            state.line("fit", x_smooth, y_spline, linestyle="dotted", label="Spline Curve")
         else:
-            plt.plot(x, y, linestyle="dotted", label="Smoothed")
+            state.line("fit", *_smooth_curve(y, rows, x, n_px), linestyle="dotted", label="Smoothed")
+    state.finish()
 
     # Axis and labels
-    plt.axhline(0, color='gray', linestyle='--', linewidth=1)
+    state.once("zero", lambda: plt.axhline(0, color='gray', linestyle='--', linewidth=1))
     plt.title("Waveform Preview")
     plt.xlabel("Time (s)")
     plt.ylabel("Voltage (V, real-world)")
 
     # Optional: Force symmetrical y-limits to improve visual accuracy
-    vabs_max = voltage_scaled.abs().max()
+    vabs_max = np.abs(voltage_scaled).max()
     plt.ylim(-vabs_max * 1.1, vabs_max * 1.1)
 
     plt.grid(True)
@@ -123,7 +435,10 @@ def plot_waveform_csv(path, smooth=False, window=5, spline=False, scale=1.0):
 
 def plot_session_log(path, smooth=False, window=5, spline=False):
     try:
-        df = pd.read_csv(path, parse_dates=["Timestamp"], comment="#", encoding="utf-8-sig")
+        # Voltages only need plot precision: parse them straight to float32
+        header = _header_columns(path) or []
+        df = _fast_read_csv(path, dtype={c: "float32" for c in header if c != "Timestamp"})
+        df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
         columns = [col for col in df.columns if col != "Timestamp"]
     except Exception as e:
         print(f"❌ Error reading session log: {e}")
@@ -134,31 +449,37 @@ def plot_session_log(path, smooth=False, window=5, spline=False):
         return
 
     if smooth or spline:
-        smoothed_df = df.copy()
-        for col in columns:
-            smoothed_df[col] = (
-                df[col].rolling(window=window, center=True).mean() if smooth else df[col]
-            )
+        # All channels in one pass, one column per channel
+        values = df[columns].to_numpy(dtype=np.float32)
+        smoothed = _rolling_mean(values, window) if smooth else values
+
+    t0, timestamp_num = _elapsed_seconds(df["Timestamp"])
 
-    timestamp_num = df["Timestamp"].astype("int64") // 10**9
+    # Time grids shared between columns, one output row per column
+    # (Line2D may keep a reference to its data, so rows are not reused)
+    grids = {}
+    y_smooth = np.empty((len(columns), SPLINE_POINTS))
 
-    plt.figure(figsize=(14, 6))
-    for col in columns:
-        plt.plot(df["Timestamp"], df[col], label=f"{col} (raw)", alpha=0.8)
+    state = _plot_state(path, figsize=(14, 6))
+    n_px = _figure_width_px(state.fig)
+    for j, col in enumerate(columns):
+        state.line((col, "raw"), *_m4_downsample(df["Timestamp"], df[col], n_px),
+                   label=f"{col} (raw)", alpha=0.8, **RAW_STYLE)
 
         if smooth or spline:
-            y = smoothed_df[col]
+            y = smoothed[:, j]
             x = timestamp_num
-            mask = ~np.isnan(y)
-
-            if spline and sum(mask) > 3:
-                x_smooth = np.linspace(x[mask].min(), x[mask].max(), 300)
-                spline_fit = make_interp_spline(x[mask], y[mask], k=3)
-                y_smooth = spline_fit(x_smooth)
-                time_smooth = pd.to_datetime(x_smooth, unit="s")
-                plt.plot(time_smooth, y_smooth, linestyle="dotted", label=f"{col} (spline)")
+            rows = _finite_rows(values[:, j], y, window, smooth)
+
+            if spline and _count_rows(rows) > 3:
+                x_smooth, time_smooth = _time_grid(x, rows, t0, grids, SPLINE_POINTS)
+                eval_cubic(x[rows], y[rows], x_smooth, out=y_smooth[j])
+                state.line((col, "fit"), time_smooth, y_smooth[j],
+                           linestyle="dotted", label=f"{col} (spline)")
             else:
-                plt.plot(df["Timestamp"], y, linestyle="dotted", label=f"{col} (smooth)")
+                state.line((col, "fit"), *_smooth_curve(y, rows, df["Timestamp"], n_px),
+                           linestyle="dotted", label=f"{col} (smooth)")
+    state.finish()
 
     plt.title("Session Log")
     plt.xlabel("Time")
@@ -169,63 +490,118 @@ def plot_session_log(path, smooth=False, window=5, spline=False):
     plt.show()
 
 
-def plot_power_log(path, smooth=False, window=5, spline=False, scale=1.0):
+# Measured columns plotted from a power log, and the energies integrated from P/S/Q
+POWER_METRICS = ["P (W)", "S (VA)", "Q (VAR)", "PF", "Vrms (V)", "Irms (A)"]
+ENERGY_COLUMNS = ["Real Energy (Wh)", "Apparent Energy (VAh)", "Reactive Energy (VARh)"]
+ENERGY_SOURCES = ["P (W)", "S (VA)", "Q (VAR)"]
+
+def _read_power_log(path, chunksize=200_000):
+    """
+    Stream a power log in chunks so multi-GB logs never exist as one big
+    parsed frame. Only Timestamp and POWER_METRICS are parsed (as float32);
+    rows with unparsable timestamps are dropped and energy is integrated
+    per chunk, carrying the last timestamp and running totals.
+    Returns (DataFrame of Timestamp + the metrics present,
+    {ENERGY_COLUMNS name: total}).
+    """
+    header = _header_columns(path) or []
+    value_cols = [m for m in POWER_METRICS if m in header]
+    reader_args = dict(usecols=["Timestamp"] + value_cols,
+                       dtype={c: "float32" for c in value_cols}, chunksize=chunksize)
     try:
-        df = pd.read_csv(path, parse_dates=["Timestamp"], comment="#", encoding="utf-8-sig")
-        metrics = [
-            "P (W)", "S (VA)", "Q (VAR)", "PF", "Vrms (V)", "Irms (A)",
-            "Real Energy (Wh)", "Apparent Energy (VAh)", "Reactive Energy (VARh)"
-        ]
+        return _integrate_power_chunks(_fast_read_csv(path, **reader_args), value_cols)
+    except Exception as e:
+        if pa is None or not isinstance(e, pa.ArrowInvalid):
+            raise
+        # A row Arrow could not convert mid-stream: redo it with pandas
+        return _integrate_power_chunks(_fast_read_csv(path, arrow=False, **reader_args), value_cols)
+
+def _integrate_power_chunks(reader, value_cols):
+    """Accumulate _read_power_log()'s chunks; see there."""
+    power_idx = [value_cols.index(c) for c in ENERGY_SOURCES]
+    ts_parts, value_parts = [], []
+    last_ns = None
+    totals = np.zeros(len(ENERGY_SOURCES))
+    for chunk in reader:
+        ts = pd.to_datetime(chunk["Timestamp"], errors="coerce")
+        keep = ts.notna().to_numpy()
+        ts_ns = ts.to_numpy(dtype="datetime64[ns]")[keep].view("int64")
+        if ts_ns.size == 0:
+            continue
+        values = chunk[value_cols].to_numpy()[keep]
 
         # --- Energy from integral (not P * total elapsed) ---
-        df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
-        df = df.dropna(subset=["Timestamp"]).reset_index(drop=True)
-        dt_s = df["Timestamp"].diff().dt.total_seconds().fillna(0.0)
+        dt_h = np.diff(ts_ns, prepend=ts_ns[0] if last_ns is None else last_ns) * (1e-9 / 3600.0)
+        # Only the totals are shown, so one matrix-vector product per chunk.
+        # Empty cells (failed readings) count as zero, as cumsum skipped them
+        power = np.nan_to_num(values[:, power_idx].astype(np.float64), nan=0.0)
+        totals += dt_h @ power
+        last_ns = ts_ns[-1]
+
+        ts_parts.append(ts_ns)
+        value_parts.append(values)
 
-        df["Real Energy (Wh)"]       = (df.get("P (W)", 0.0).astype(float) * dt_s / 3600.0).cumsum()
-        df["Apparent Energy (VAh)"]  = (df.get("S (VA)", 0.0).astype(float) * dt_s / 3600.0).cumsum()
-        df["Reactive Energy (VARh)"] = (df.get("Q (VAR)", 0.0).astype(float) * dt_s / 3600.0).cumsum()
+    if not ts_parts:
+        return pd.DataFrame(columns=["Timestamp"] + value_cols), {}
 
-        df = df[["Timestamp"] + [m for m in metrics if m in df.columns]]
+    df = pd.DataFrame(np.concatenate(value_parts), columns=value_cols)
+    df.insert(0, "Timestamp", pd.to_datetime(np.concatenate(ts_parts), unit="ns"))
+    return df, dict(zip(ENERGY_COLUMNS, totals.tolist()))
+
+def plot_power_log(path, smooth=False, window=5, spline=False, scale=1.0):
+    try:
+        df, energy = _read_power_log(path)
     except Exception as e:
         print(f"❌ Error reading power log: {e}")
         return
+    if df.empty:
+        print("⚠️ No valid rows found in power log.")
+        return
 
-    # --- Copy and scale data (physically correct) ---
-    scaled_df = df.copy()
-    scale_cols = [c for c in ["P (W)", "S (VA)", "Q (VAR)", "Irms (A)"] if c in scaled_df.columns]
-    energy_cols = [c for c in ["Real Energy (Wh)", "Apparent Energy (VAh)", "Reactive Energy (VARh)"] if c in scaled_df.columns]
+    # --- Scale data (physically correct) ---
+    scale_cols = [c for c in ["P (W)", "S (VA)", "Q (VAR)", "Irms (A)"] if c in df.columns]
 
+    # Plain arrays from here on: columns come out of the frame without a
+    # copy and only the scaled block is new memory.
+    timestamps = df["Timestamp"].to_numpy()
+    data = {c: df[c].to_numpy() for c in df.columns[1:]}
     if scale != 1.0:
-        for col in scale_cols + energy_cols:
-            scaled_df[col] = scaled_df[col].astype(float) * scale  # Vrms and PF are NOT scaled
+        # One float32 multiply over the scaled block; Vrms and PF are NOT scaled.
+        mat = df[scale_cols].to_numpy(dtype=np.float32, copy=True)
+        mat *= np.float32(scale)
+        data.update(zip(scale_cols, mat.T))
+    plot_cols = list(data)
 
     # for spline timing
-    timestamp_num = (scaled_df["Timestamp"].astype("int64") // 10**9).to_numpy()
-
-    plt.figure(figsize=(14, 7))
-    for col in [c for c in scaled_df.columns[1:] if c not in energy_cols]:
-        raw = scaled_df[col].astype(float)
+    t0, timestamp_num = _elapsed_seconds(timestamps)
+    grids = {}
+    y_smooth = np.empty((len(plot_cols), SPLINE_POINTS))
+
+    state = _plot_state(path, figsize=(14, 7))
+    n_px = _figure_width_px(state.fig)
+    for j, col in enumerate(plot_cols):
+        raw = data[col]
         is_scaled = (scale != 1.0) and (col in scale_cols)
         label = f"{col} (raw × {scale})" if is_scaled else f"{col} (raw)"
-        plt.plot(scaled_df["Timestamp"], raw, label=label, alpha=0.85)
+        state.line((col, "raw"), *_m4_downsample(timestamps, raw, n_px),
+                   label=label, alpha=0.85, **RAW_STYLE)
 
         if smooth or spline:
-            y = raw.rolling(window=window, center=True).mean() if smooth else raw
-            mask = ~np.isnan(y.to_numpy())
-
-            if spline and mask.sum() > 3:
-                x_smooth = np.linspace(timestamp_num[mask].min(), timestamp_num[mask].max(), 300)
-                spline_fit = make_interp_spline(timestamp_num[mask], y.to_numpy()[mask], k=3)
-                y_smooth = spline_fit(x_smooth)
-                time_smooth = pd.to_datetime(x_smooth, unit="s")
-                plt.plot(time_smooth, y_smooth, linestyle="dotted", label=f"{col} (spline)")
+            y = _rolling_mean(raw, window) if smooth else raw
+            rows = _finite_rows(raw, y, window, smooth)
+
+            if spline and _count_rows(rows) > 3:
+                x_smooth, time_smooth = _time_grid(timestamp_num, rows, t0, grids, SPLINE_POINTS)
+                eval_cubic(timestamp_num[rows], y[rows], x_smooth, out=y_smooth[j])
+                state.line((col, "fit"), time_smooth, y_smooth[j],
+                           linestyle="dotted", label=f"{col} (spline)")
             else:
-                plt.plot(scaled_df["Timestamp"], y, linestyle="dotted", label=f"{col} (smooth)")
+                state.line((col, "fit"), *_smooth_curve(y, rows, timestamps, n_px),
+                           linestyle="dotted", label=f"{col} (smooth)")
+    state.finish()
 
     # --- Robust y-limits to avoid early outliers dominating ---
-    plot_cols = [c for c in scaled_df.columns[1:] if c not in energy_cols]
-    y_stack = np.concatenate([scaled_df[c].astype(float).to_numpy() for c in plot_cols]) if plot_cols else np.array([])
+    y_stack = np.concatenate([data[c] for c in plot_cols]) if plot_cols else np.array([])
     if y_stack.size:
         lo, hi = np.nanpercentile(y_stack, [1, 99])
         if np.isfinite(lo) and np.isfinite(hi) and hi > lo:
@@ -239,11 +615,11 @@ def plot_power_log(path, smooth=False, window=5, spline=False, scale=1.0):
     plt.grid(True)
 
     # --- Energy totals (legend injection) ---
-    last = scaled_df.iloc[-1]
+    last = {c: total * scale for c, total in energy.items()}
     energy_labels = []
-    if "Real Energy (Wh)" in scaled_df:      energy_labels.append(f"Real Energy: {last['Real Energy (Wh)']:.2f} Wh")
-    if "Apparent Energy (VAh)" in scaled_df: energy_labels.append(f"Apparent Energy: {last['Apparent Energy (VAh)']:.2f} VAh")
-    if "Reactive Energy (VARh)" in scaled_df:energy_labels.append(f"Reactive Energy: {last['Reactive Energy (VARh)']:.2f} VARh")
+    if "Real Energy (Wh)" in last:      energy_labels.append(f"Real Energy: {last['Real Energy (Wh)']:.2f} Wh")
+    if "Apparent Energy (VAh)" in last: energy_labels.append(f"Apparent Energy: {last['Apparent Energy (VAh)']:.2f} VAh")
+    if "Reactive Energy (VARh)" in last:energy_labels.append(f"Reactive Energy: {last['Reactive Energy (VARh)']:.2f} VARh")
     energy_handles = [Line2D([0], [0], color='none') for _ in energy_labels]
 
     handles, labels = plt.gca().get_legend_handles_labels()
@@ -276,9 +652,11 @@ def plot_power_log(path, smooth=False, window=5, spline=False, scale=1.0):
     scope = get_scope_info()
     footer_line_2 = f"{scope['Model']} | SN: {scope['Serial']} | FW: {scope['FW']} | Timestamp: {timestamp}"
 
-    fig = plt.gcf()
-    fig.text(0.01, 0.018, footer_line_1, ha="left", va="bottom", fontsize=7, color="#444444")
-    fig.text(0.01, 0.005, footer_line_2, ha="left", va="bottom", fontsize=7, color="#555555")
+    fig = state.fig
+    state.once("footer_1", lambda: fig.text(0.01, 0.018, "", ha="left", va="bottom",
+                                            fontsize=7, color="#444444")).set_text(footer_line_1)
+    state.once("footer_2", lambda: fig.text(0.01, 0.005, "", ha="left", va="bottom",
+                                            fontsize=7, color="#555555")).set_text(footer_line_2)
 
     plt.tight_layout()
 
@@ -323,15 +701,16 @@ def main():
         print(f"❌ File not found: {path}")
         sys.exit(1)
 
-    if is_waveform_csv(path):
+    kind = _classify(path)
+    if kind == "waveform":
         plot_waveform_csv(path, smooth=args.smooth, window=args.window, spline=args.spline, scale=args.scale)
 
-    elif is_power_log(path):
+    elif kind == "power":
         plot_power_log(path, smooth=args.smooth, window=args.window, spline=args.spline, scale=args.scale)
 
-    elif is_session_log(path):
+    elif kind == "session":
         plot_session_log(path, smooth=args.smooth, window=args.window, spline=args.spline)
-    
+
     else:
         print("❌ Unknown or unsupported CSV format.")
 
@@ -0,0 +1,161 @@
+# utils/wave_stats.py
+"""
+Fused waveform statistics (Vpp, Vavg, Vrms) computed straight from the
+integer samples of a :WAV:DATA? block, without materializing a volts array.
+decode_minmax() does the same for plotting: an M4 reduction of the samples
+with only the kept points converted to volts.
+
+Uses Numba when installed; otherwise falls back to NumPy reductions.
+With CuPy installed, decode_minmax() runs very long traces on the GPU.
+"""
+
+import math
+import numpy as np
+
+from utils.debug import log_debug
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    import cupy as cp
+except ImportError:
+    cp = None
+
+# Traces longer than this go to the GPU in decode_minmax() (CuPy only);
+# below it the upload costs more than the reduction saves
+GPU_MIN_SAMPLES = 5_000_000
+
+# Set after the first GPU failure; later calls go straight to the CPU
+_gpu_disabled = False
+
+
+def _vpp_vavg_vrms_py(raw, yref, yinc, yorig):
+    """
+    Return (Vpp, Vavg, Vrms) of integer samples (NumPy fallback).
+
+    BYTE samples only take 256 distinct values, so a single bincount over
+    the bytes is enough; the affine transform is then applied to the
+    levels rather than to every sample.
+    """
+    n = raw.shape[0]
+    if n == 0:
+        return 0.0, 0.0, 0.0
+    counts = np.bincount(raw, minlength=256)
+    levels = (np.arange(counts.shape[0]) - yref) * yinc + yorig
+    present = levels[counts > 0]
+    vpp = float(present.max() - present.min())
+    vavg = float(np.dot(counts, levels)) / n
+    vrms = math.sqrt(float(np.dot(counts, levels * levels)) / n)
+    return vpp, vavg, vrms
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def vpp_vavg_vrms(raw, yref, yinc, yorig):
+        """Return (Vpp, Vavg, Vrms) of integer samples in one pass."""
+        n = raw.shape[0]
+        if n == 0:
+            return 0.0, 0.0, 0.0
+        s = 0.0
+        s2 = 0.0
+        mn = math.inf
+        mx = -math.inf
+        for i in range(n):
+            v = (raw[i] - yref) * yinc + yorig
+            s += v
+            s2 += v * v
+            if v < mn:
+                mn = v
+            if v > mx:
+                mx = v
+        return mx - mn, s / n, math.sqrt(s2 / n)
+else:
+    vpp_vavg_vrms = _vpp_vavg_vrms_py
+
+
+def _decode_minmax_py(raw, lut, npx, xp=np):
+    """
+    M4 reduction of BYTE samples into npx buckets (the last one takes the
+    remainder): (indices, volts) of the first, min, max and last sample of
+    each bucket, in time order (NumPy fallback). lut maps byte -> volts;
+    it is monotonic, so the byte extremes are the voltage extremes.
+    xp is the array module the inputs live in (NumPy or CuPy).
+    """
+    n = raw.shape[0]
+    step = n // npx
+    full = (npx - 1) * step
+    starts = xp.arange(0, full, step)
+    rows = raw[:full].reshape(npx - 1, step)
+    tail = raw[full:]
+    lo = xp.concatenate([starts + rows.argmin(axis=1), xp.atleast_1d(full + tail.argmin())])
+    hi = xp.concatenate([starts + rows.argmax(axis=1), xp.atleast_1d(full + tail.argmax())])
+    idx = xp.empty(4 * npx, dtype=xp.int64)
+    idx[0::4] = xp.concatenate([starts, xp.asarray([full])])
+    idx[1::4] = xp.minimum(lo, hi)
+    idx[2::4] = xp.maximum(lo, hi)
+    idx[3::4] = xp.concatenate([starts + (step - 1), xp.asarray([n - 1])])
+    return idx, lut[raw[idx]]
+
+
+def _decode_minmax_gpu(raw, lut, npx):
+    """_decode_minmax_py() on the GPU; only the kept points come back."""
+    idx, vals = _decode_minmax_py(cp.asarray(raw), cp.asarray(lut), npx, xp=cp)
+    return idx.get(), vals.get()
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True, fastmath=True)
+    def _decode_minmax_cpu(raw, lut, npx):
+        """M4 reduction of BYTE samples in one parallel pass; see above."""
+        n = raw.shape[0]
+        step = n // npx
+        idx = np.empty(4 * npx, dtype=np.int64)
+        vals = np.empty(4 * npx, dtype=lut.dtype)
+        for b in prange(npx):
+            start = b * step
+            stop = n if b == npx - 1 else start + step
+            lo = start
+            hi = start
+            rlo = raw[start]
+            rhi = raw[start]
+            for i in range(start + 1, stop):
+                r = raw[i]
+                if r < rlo:
+                    rlo = r
+                    lo = i
+                elif r > rhi:
+                    rhi = r
+                    hi = i
+            if hi < lo:
+                lo, hi = hi, lo
+            k = 4 * b
+            idx[k] = start
+            idx[k + 1] = lo
+            idx[k + 2] = hi
+            idx[k + 3] = stop - 1
+            for j in range(4):
+                vals[k + j] = lut[raw[idx[k + j]]]
+        return idx, vals
+else:
+    _decode_minmax_cpu = _decode_minmax_py
+
+
+def decode_minmax(raw, lut, npx):
+    """
+    M4 reduction of BYTE samples into npx buckets: (indices, volts) of the
+    first, min, max and last sample of each, in time order. Very long
+    traces run on the GPU when CuPy is usable.
+    """
+    global _gpu_disabled
+    if cp is not None and not _gpu_disabled and raw.shape[0] > GPU_MIN_SAMPLES:
+        try:
+            return _decode_minmax_gpu(raw, lut, npx)
+        except Exception as e:
+            # No device, driver mismatch, out of memory: report it once and
+            # don't pay for another failed upload on the next trace
+            _gpu_disabled = True
+            log_debug(f"⚠️ CuPy decode_minmax failed, using the CPU from now on: {e}")
+    return _decode_minmax_cpu(raw, lut, npx)
@@ -11,9 +11,10 @@
 # - Select channel, sample count, and point mode (NORM, MAX, RAW)
 # - Stop acquisition for stable memory access (optional)
 # - Plot waveform with matplotlib
-# - Save waveform plot as PNG (--save)
+# - Save waveform plot as PNG (--save; no plot window is opened then)
 # - Print acquisition settings (sample rate, memory depth)
 # - Auto-detect scope over-delivery and inform the user
+# - fetch_waveform(scope, ...) for repeated fetches over one open connection
 #
 # Example:
 #   python3 plot_1000_samples.py 192.168.1.54 --channel 1 --samples 1200 --mode RAW --stop --save
@@ -23,10 +24,10 @@
 
 import sys
 import os
+import re
 import argparse
 import time
 import numpy as np
-import matplotlib.pyplot as plt
 
 # Allow import of project modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -35,122 +36,332 @@ from scpi.interface import connect_scope, scpi_lock, safe_query
 from config import BLACKLISTED_COMMANDS, WAV_POINTS
 import config
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("ip", help="Scope IP address")
-    parser.add_argument("--channel", type=str, default="1", help="Channel (1-4, MATH1, etc.)")
-    parser.add_argument("--samples", type=int, default=1000, help="Number of samples to fetch")
-    parser.add_argument("--mode", type=str, choices=["NORM", "MAX", "RAW"], default="NORM",
-                        help="Waveform point mode: NORM (screen), MAX (up to max), RAW (full memory)")
-    parser.add_argument("--stop", action="store_true", help="Stop acquisition before fetch (safer for RAW)")
-    parser.add_argument("--save", action="store_true", help="Save plot as PNG")
-    args = parser.parse_args()
+# Optional: SIMD MinMaxLTTB point selection (falls back to NumPy M4 below)
+try:
+    from tsdownsample import MinMaxLTTBDownsampler
+except ImportError:
+    MinMaxLTTBDownsampler = None
 
-    config.WAV_POINTS = args.samples
+# Socket read size for :WAV:DATA? transfers (connect_scope() uses 100 KiB)
+READ_CHUNK_BYTES = 1024 * 1024
 
-    scope = connect_scope(args.ip)
-    if not scope:
-        print("❌ Could not connect to scope.")
-        return
+# Points per :WAV:STAR/:WAV:STOP window for large (RAW/MAX) transfers
+WINDOW_POINTS = 250_000
 
-    chan = args.channel if args.channel.upper().startswith("MATH") else f"CHAN{args.channel}"
-    print(f"📡 Connected. Fetching {args.samples} samples from {chan}...")
+# :WAV:PRE? = format,type,points,count,xinc,xorig,xref,yinc,yorig,yref
+_PRE_RE = re.compile(r"\s*(?:[^,]*,){4}([^,]+),([^,]+),[^,]*,([^,]+),([^,]+),([^,]+)")
 
+def parse_preamble(text):
+    """Return (xinc, xorig, yinc, yorig, yref) from a :WAV:PRE? reply."""
+    m = _PRE_RE.match(text)
+    if m is None:
+        raise ValueError(f"Malformed :WAV:PRE? reply {text!r}")
+    return tuple(map(float, m.groups()))
+
+def read_wav_block(scope):
+    """
+    Send :WAV:DATA? and read the IEEE 488.2 block ('#N<len><data>\\n')
+    straight off the connection: the '#N' prefix, the N length digits,
+    then exactly <len> payload bytes. Returns a uint8 view of the
+    samples without copying. Caller must hold scpi_lock.
+    """
+    scope.write(":WAV:DATA?")
+    head = scope.read_bytes(2)
+    if head[:1] != b"#" or not head[1:2].isdigit() or head[1:2] == b"0":
+        raise ValueError(f"Unexpected block header {head!r}")
+    length = int(scope.read_bytes(int(head[1:2])))
+    payload = scope.read_bytes(length)
+    scope.read_bytes(1)  # trailing newline
+    return np.frombuffer(payload, dtype=np.uint8)
+
+# Window selection, formatted once per window of a windowed read
+_WINDOW = ":WAV:STAR {};:WAV:STOP {}"
+
+def read_wav_windows(scope, total, setup, window=WINDOW_POINTS):
+    """
+    Read `total` points in :WAV:STAR/:WAV:STOP windows into one
+    preallocated uint8 array. A short window ends the read, and only the
+    points written up to it are returned. scpi_lock is taken per window
+    and released in between, so other threads sharing the handle get a
+    turn during a long RAW download. Each window first re-sends `setup`
+    (the chained :WAV:* configuration) in case one of them retargeted
+    the source. Caller must not hold scpi_lock.
+    """
+    if total <= window:
+        with scpi_lock:
+            scope.write(setup)
+            return read_wav_block(scope)
+
+    raw = np.empty(total, dtype=np.uint8)
+    filled = 0
+    window_cmd = f"{setup};{_WINDOW}".format
     try:
+        for start in range(1, total + 1, window):
+            stop = min(start + window - 1, total)
+            with scpi_lock:
+                scope.write(window_cmd(start, stop))
+                block = read_wav_block(scope)
+            expected = stop - start + 1
+            n = min(len(block), expected)
+            raw[start - 1:start - 1 + n] = block[:n]
+            filled = start - 1 + n
+            print(f"   … {filled}/{total} points", end="\r", flush=True)
+            if len(block) != expected:
+                print(f"\n⚠️ Window {start}-{stop} returned {len(block)} points "
+                      f"(expected {expected})")
+            if n < expected:
+                # Keep only the contiguous prefix that was actually written
+                break
+        print()
+    finally:
+        # Leave the full record selected for the next reader
         with scpi_lock:
-            # Optional: stop scope before fetch (RAW stability)
-            if args.stop:
-                scope.write(":STOP")
-                print("🛑 Acquisition stopped for waveform readout")
+            scope.write(_WINDOW.format(1, total))
+    return raw[:filled]
+
+def m4_indices(v, n_px):
+    """
+    Indices of the first, min, max and last sample in each of n_px
+    buckets (M4), in time order. Plotting only these is pixel-identical
+    to plotting every sample. Returns slice(None) when v is already
+    short enough to draw as is.
+    """
+    n = v.shape[0]
+    if n <= 4 * n_px:
+        return slice(None)
 
-            mode = args.mode.upper()
-            valid_modes = ["NORM", "MAX", "RAW"]
-            if mode not in valid_modes:
-                print(f"⚠️ Invalid mode '{mode}' — defaulting to NORM.")
-                mode = "NORM"
+    step = n // n_px
+    full = n_px * step
+    starts = np.arange(0, full, step)
+    rows = v[:full].reshape(n_px, step)
+    picks = [starts,
+             starts + rows.argmin(axis=1),
+             starts + rows.argmax(axis=1),
+             starts + (step - 1)]
+    if full < n:
+        tail = v[full:]
+        picks.append(np.array([full, full + tail.argmin(), full + tail.argmax(), n - 1]))
+    return np.unique(np.concatenate(picks))
+
+def query_chained(scope, commands, defaults):
+    """
+    multi_query() for callers that already hold scpi_lock: one ';'-chained
+    query, falling back to one safe_query() per command.
+    """
+    try:
+        parts = [p.strip() for p in scope.query(";".join(commands)).split(";")]
+        if len(parts) == len(commands):
+            return parts
+    except Exception:
+        pass
+    return [safe_query(scope, cmd, default) for cmd, default in zip(commands, defaults)]
 
+# Points kept by MinMaxLTTB, and the length below which nothing is reduced
+LTTB_POINTS = 2000
+LTTB_MIN_SAMPLES = 5000
+
+# Above this many samples the M4 reduction runs on the raw bytes and only
+# the kept points are decoded (utils.wave_stats.decode_minmax)
+FUSED_MIN_SAMPLES = 1_000_000
+
+def plot_indices(v, n_px):
+    """
+    Samples to draw for the trace v: MinMaxLTTB via tsdownsample when
+    installed, else the M4 reduction for a plot n_px pixels wide. Both
+    pick the same points on the raw bytes as on the volts, since the
+    decode is affine.
+    """
+    if MinMaxLTTBDownsampler is not None and v.shape[0] > LTTB_MIN_SAMPLES:
+        return MinMaxLTTBDownsampler().downsample(v, n_out=LTTB_POINTS)
+    return m4_indices(v, n_px)
+
+VALID_MODES = ["NORM", "MAX", "RAW"]
+
+def read_waveform(scope, chan, samples=1000, mode="NORM", stop=False):
+    """
+    Configure `chan` (e.g. "CHAN1", "MATH1") on an open scope handle and
+    read its waveform undecoded. Returns (raw uint8 samples, 256-entry
+    float32 volts table, xinc, xorig) with volts = lut[raw], or None if
+    the channel is hidden or nothing came back.
+    """
+    mode = mode.upper()
+    if mode not in VALID_MODES:
+        print(f"⚠️ Invalid mode '{mode}' — defaulting to NORM.")
+        mode = "NORM"
+
+    setup = (f":WAV:FORM BYTE;:WAV:MODE {mode};:WAV:POIN:MODE {mode};"
+             f":WAV:POIN {samples};:WAV:SOUR {chan}")
+
+    # Optional: stop scope before fetch (RAW stability)
+    if stop:
+        with scpi_lock:
+            scope.write(":STOP")
+        print("🛑 Acquisition stopped for waveform readout")
+    try:
+        # Setup and preamble under one short lock hold; the bulk transfer
+        # below takes the lock per window instead
+        with scpi_lock:
             if safe_query(scope, f":{chan}:DISP?") != "1":
                 print(f"⚠️ Channel {chan} is not visible — skipping.")
-                return
+                return None
 
-            scope.write(":WAV:FORM BYTE")
-            scope.write(f":WAV:MODE {mode}")
             print(f"🔧 Using point mode: {mode}")
-            scope.write(f":WAV:POIN:MODE {mode}")
-            scope.write(f":WAV:POIN {args.samples}")
-            scope.write(f":WAV:SOUR {chan}")
-
-            scope.query(":WAV:PRE?")
-            time.sleep(0.1)
-            pre = scope.query(":WAV:PRE?").split(",")
-            xinc = float(pre[4])
-            xorig = float(pre[5])
-            yinc = float(pre[7])
-            yorig = float(pre[8])
-            yref = float(pre[9])
-            probe = float(safe_query(scope, f":{chan}:PROB?", "1.0"))
-
-            # Print acquisition config
-            srate = safe_query(scope, ":ACQ:SRAT?")
-            mdepth = safe_query(scope, ":ACQ:MDEP?")
+            # One compound command instead of five round-trips
+            scope.write(setup)
+
+            # PRE is valid as soon as the setup writes above are processed
+            xinc, xorig, yinc, yorig, yref = parse_preamble(scope.query(":WAV:PRE?"))
+            # Probe ratio and acquisition config in one round-trip
+            probe, srate, mdepth = query_chained(
+                scope, [f":{chan}:PROB?", ":ACQ:SRAT?", ":ACQ:MDEP?"], ["1.0", "N/A", "N/A"])
+            probe = float(probe)
             print(f"📊 Sample Rate: {srate} Sa/s — Memory Depth: {mdepth} pts")
 
-            print("⏳ Downloading waveform data...")
-            raw = scope.query_binary_values(":WAV:DATA?", datatype='B', container=np.array)
+            # Points the scope will deliver for these settings (it may
+            # ignore the requested count in RAW/MAX)
+            try:
+                total = int(scope.query(":WAV:POIN?"))
+            except ValueError:
+                total = samples
+
+        print("⏳ Downloading waveform data...")
+        raw = read_wav_windows(scope, total, setup)
 
-            # Feedback on returned length
-            if len(raw) < args.samples:
-                print(f"⚠️ Only received {len(raw)} samples (requested {args.samples}).")
+        # Feedback on returned length
+        if len(raw) < samples:
+            print(f"⚠️ Only received {len(raw)} samples (requested {samples}).")
 
-                if ":WAV:POIN:MODE?" in BLACKLISTED_COMMANDS:
-                    confirmed_mode = "N/A (blacklisted)"
-                else:
+            if ":WAV:POIN:MODE?" in BLACKLISTED_COMMANDS:
+                confirmed_mode = "N/A (blacklisted)"
+            else:
+                with scpi_lock:
                     confirmed_mode = safe_query(scope, ":WAV:POIN:MODE?").strip().upper()
 
-                print(f"📟 Scope confirmed mode: {confirmed_mode}")
+            print(f"📟 Scope confirmed mode: {confirmed_mode}")
 
-                if confirmed_mode not in valid_modes:
-                    print(f"⚠️ Could not confirm point mode. Scope may not support ':WAV:POIN:MODE?'.")
-                elif confirmed_mode != mode:
-                    print(f"⚠️ Requested mode '{mode}' but scope is using '{confirmed_mode}' instead.")
-                    print("ℹ️ Scope may have rejected the mode due to memory or acquisition settings.")
-                else:
-                    print(f"ℹ️ Scope accepted mode '{mode}', but still returned fewer samples.")
-                    print("ℹ️ Try increasing timebase or memory depth (e.g., :ACQ:MDEP 56000).")
+            if confirmed_mode not in VALID_MODES:
+                print(f"⚠️ Could not confirm point mode. Scope may not support ':WAV:POIN:MODE?'.")
+            elif confirmed_mode != mode:
+                print(f"⚠️ Requested mode '{mode}' but scope is using '{confirmed_mode}' instead.")
+                print("ℹ️ Scope may have rejected the mode due to memory or acquisition settings.")
             else:
-                print(f"✅ Received full {len(raw)} samples from scope.")
+                print(f"ℹ️ Scope accepted mode '{mode}', but still returned fewer samples.")
+                print("ℹ️ Try increasing timebase or memory depth (e.g., :ACQ:MDEP 56000).")
+        else:
+            print(f"✅ Received full {len(raw)} samples from scope.")
+    finally:
+        if stop:
+            with scpi_lock:
+                scope.write(":RUN")
+            print("▶️ Acquisition resumed.")
+
+    if len(raw) == 0:
+        print("⚠️ No waveform data returned.")
+        return None
+
+    # Volts are ((raw - yref) * yinc + yorig) * probe. BYTE samples take
+    # only 256 values, so decoding is a gather through this table
+    lut = ((np.arange(256, dtype=np.float32) - np.float32(yref))
+           * np.float32(yinc) + np.float32(yorig)) * np.float32(probe)
+    return raw, lut, xinc, xorig
 
+def fetch_waveform(scope, chan, samples=1000, mode="NORM", stop=False):
+    """
+    read_waveform(), decoded: (volts as float32, xinc, xorig) or None.
+    The handle stays open, so repeated fetches skip the VISA session setup.
+    """
+    result = read_waveform(scope, chan, samples, mode, stop)
+    if result is None:
+        return None
+    raw, lut, xinc, xorig = result
+    return np.take(lut, raw), xinc, xorig
 
-            if len(raw) == 0:
-                print("⚠️ No waveform data returned.")
-                return
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("ip", help="Scope IP address")
+    parser.add_argument("--channel", type=str, default="1", help="Channel (1-4, MATH1, etc.)")
+    parser.add_argument("--samples", type=int, default=1000, help="Number of samples to fetch")
+    parser.add_argument("--mode", type=str, choices=VALID_MODES, default="NORM",
+                        help="Waveform point mode: NORM (screen), MAX (up to max), RAW (full memory)")
+    parser.add_argument("--stop", action="store_true", help="Stop acquisition before fetch (safer for RAW)")
+    parser.add_argument("--save", action="store_true", help="Save plot as PNG")
+    args = parser.parse_args()
 
-            # Decode to voltage
-            t = xorig + np.arange(len(raw)) * xinc
-            v = ((raw - yref) * yinc + yorig) * probe
+    config.WAV_POINTS = args.samples
 
-            # Plot
-            plt.figure(figsize=(10, 4))
-            plt.plot(t, v, linewidth=1.0)
-            plt.title(f"{len(raw)} Samples from {chan} (mode: {mode})")
-            plt.xlabel("Time (s)")
-            plt.ylabel("Voltage (V)")
-            plt.grid(True)
-            plt.tight_layout()
+    scope = connect_scope(args.ip)
+    if not scope:
+        print("❌ Could not connect to scope.")
+        return
 
-            if args.save:
-                fname = f"{chan}_{len(raw)}pts_{mode}_{time.strftime('%Y%m%d_%H%M%S')}.png"
-                plt.savefig(fname, dpi=150)
-                print(f"🖼️  Saved plot as {fname}")
+    # matplotlib is only needed once there is something to plot, so
+    # --help and an offline scope don't pay for importing it.
+    # Headless --save runs render straight to a file with Agg; pick the
+    # backend before pyplot is imported
+    import matplotlib
+    if args.save and not os.environ.get("DISPLAY"):
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import FuncFormatter
 
-            plt.show()
+    # Fewer, larger reads for big blocks, and time for RAW transfers;
+    # block reads are sized, so no read termination is needed
+    scope.chunk_size = READ_CHUNK_BYTES
+    scope.timeout = max(scope.timeout, 20000)
+    scope.read_termination = None
+    scope.write_termination = "\n"
 
-            if args.stop:
-                scope.write(":RUN")
-                print("▶️ Acquisition resumed.")
+    chan = args.channel if args.channel.upper().startswith("MATH") else f"CHAN{args.channel}"
+    print(f"📡 Connected. Fetching {args.samples} samples from {chan}...")
 
+    try:
+        result = read_waveform(scope, chan, args.samples, args.mode, args.stop)
     except Exception as e:
         print(f"❌ Error during waveform fetch: {e}")
+        return
+    if result is None:
+        return
+    raw, lut, xinc, xorig = result
+    n = len(raw)
+    mode = args.mode.upper()
+
+    # Plot against the sample index; the formatter turns ticks into
+    # seconds, so no time array is ever built
+    fig = plt.figure(figsize=(10, 4))
+    ax = plt.gca()
+    # ~4 vertices per pixel column of the saved (150 dpi) image
+    n_px = int(fig.get_size_inches()[0] * 150)
+    if n > FUSED_MIN_SAMPLES:
+        # One pass over the bytes; the full volts array is never built.
+        # Imported here: wave_stats loads Numba/CuPy when installed
+        from utils.wave_stats import decode_minmax
+        idx, vals = decode_minmax(raw, lut, n_px)
+        ax.plot(idx, vals, linewidth=1.0, rasterized=True)
+    else:
+        # Pick points on the bytes, then decode only those
+        idx = plot_indices(raw, n_px)
+        if isinstance(idx, slice):
+            ax.plot(np.take(lut, raw), linewidth=1.0, rasterized=True)
+        else:
+            ax.plot(idx, np.take(lut, raw[idx]), linewidth=1.0, rasterized=True)
+    # Span exactly the record, xorig .. xorig + (n - 1) * xinc
+    ax.set_xlim(0, n - 1)
+    # With a delayed timebase (|xorig| far beyond the record span) absolute
+    # times would all round to the same label; show the offset once instead
+    t0 = xorig if abs(xorig) <= 10 * (n - 1) * xinc else 0.0
+    ax.xaxis.set_major_formatter(FuncFormatter(lambda i, _: f"{t0 + i * xinc:.3g}"))
+    plt.title(f"{n} Samples from {chan} (mode: {mode})")
+    plt.xlabel("Time (s)" if t0 == xorig else f"Time (s) from {xorig:.6g} s")
+    plt.ylabel("Voltage (V)")
+    plt.grid(True)
+    plt.tight_layout()
+
+    if args.save:
+        fname = f"{chan}_{n}pts_{mode}_{time.strftime('%Y%m%d_%H%M%S')}.png"
+        plt.savefig(fname, dpi=150)
+        print(f"🖼️  Saved plot as {fname}")
+    else:
+        plt.show()
 
 if __name__ == "__main__":
     main()